@@ -0,0 +1,148 @@
+"""
+账号标识（用户名 / 邮箱 / 手机号）占用情况的进程内预判（Bloom filter）
+
+- 判定"不存在"时该标识一定未被占用，注册表单的可用性检查与注册前的冲突检查无需查询数据库
+- 判定"可能存在"时由调用方查数据库确认（误判率约为 error_rate）
+- 标识按 strip + casefold 归一化后加入，MySQL 大小写不敏感的排序规则下"不存在"的判定同样成立
+- 首次使用时全量加载（在新的位数组中加载完再替换）；之后调用方定期把 account_id 大于
+  max_account_id - LOAD_OVERLAP 的账号加入（其他 worker 注册的账号；重叠部分覆盖 id 分配后稍晚提交的事务），
+  标识数超过容量时全量重建
+
+不支持删除：账号注销或修改邮箱 / 手机号后旧值仍判定为"可能存在"，只是多一次数据库查询。
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Optional
+
+IDENTIFIER_FIELDS = ('username', 'email', 'mobile_phone')
+# 增量加载时回看的 account_id 数
+LOAD_OVERLAP = 100
+
+
+class BloomFilter:
+    """定长位数组 + k 个哈希位置（由一次 blake2b 摘要双重哈希得到）"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        positions = self._positions(key)
+        # 置位是读-改-写，并发加入需要加锁，否则可能丢位（造成漏判）
+        with self._lock:
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not self._bits[position >> 3] & mask:
+                    self._bits[position >> 3] |= mask
+                    added = True
+            # 所有位都已置位（重复加入或误判）时不计数，count 近似为不同标识数
+            if added:
+                self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+def _identifier_key(field: str, value: str) -> str:
+    return f"{field}:{value.strip().casefold()}"
+
+
+def _add_account(bloom: BloomFilter, username: Optional[str], email: Optional[str], mobile_phone: Optional[str]):
+    for field, value in zip(IDENTIFIER_FIELDS, (username, email, mobile_phone)):
+        if value:
+            bloom.add(_identifier_key(field, value))
+
+
+class AccountFilter:
+    """账号标识预判 + 加载进度（线程安全；capacity 为 0 时不启用，所有标识都判定为可能存在）"""
+
+    def __init__(self, capacity: int, error_rate: float, refresh_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.max_account_id = 0
+        self.checks = 0
+        self.answered = 0
+        # 同一时间只有一个线程加载（其他线程继续用现有数据判定）
+        self.load_lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._refreshed_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def needs_refresh(self) -> bool:
+        if not self.enabled:
+            return False
+        return self._filter is None or time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def needs_rebuild(self) -> bool:
+        """未加载，或标识数超过容量（误判率随之上升）"""
+        return self._filter is None or self._filter.count > self._filter.capacity
+
+    def load_since(self) -> int:
+        """增量加载的起点（加载 account_id 大于该值的账号）"""
+        return max(0, self.max_account_id - LOAD_OVERLAP)
+
+    def rebuild(self, rows):
+        """全量加载 rows（account_id, username, email, mobile_phone），完成后替换现有数据"""
+        expected = self._filter.count if self._filter is not None else 0
+        bloom = BloomFilter(max(self.capacity, 2 * expected), self.error_rate)
+        max_account_id = 0
+        for account_id, username, email, mobile_phone in rows:
+            _add_account(bloom, username, email, mobile_phone)
+            max_account_id = max(max_account_id, account_id)
+        self._filter = bloom
+        self.max_account_id = max_account_id
+        self._refreshed_at = time.monotonic()
+
+    def extend(self, rows):
+        """增量加入 rows（未加载时忽略）"""
+        bloom = self._filter
+        if bloom is None:
+            return
+        for account_id, username, email, mobile_phone in rows:
+            _add_account(bloom, username, email, mobile_phone)
+            self.max_account_id = max(self.max_account_id, account_id)
+        self._refreshed_at = time.monotonic()
+
+    def might_exist(self, field: str, value: str) -> bool:
+        """False 表示一定未被占用；True 表示需要查询数据库确认"""
+        self.checks += 1
+        bloom = self._filter
+        if bloom is None or _identifier_key(field, value) in bloom:
+            return True
+        self.answered += 1
+        return False
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        return {
+            'enabled': self.enabled,
+            'loaded': bloom is not None,
+            'identifiers': bloom.count if bloom is not None else 0,
+            'bytes': bloom.nbytes if bloom is not None else 0,
+            'max_account_id': self.max_account_id,
+            'checks': self.checks,
+            'answered_without_db': self.answered,
+        }
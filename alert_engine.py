@@ -0,0 +1,155 @@
+"""
+服务端预警价评估引擎
+
+按股票代码维护有序的预警价数组（array('d')）与并行的账户数组（array('q')），
+行情 tick 到达时用 bisect 定位上一价与当前价之间被穿越的预警价区间，
+单次评估为 O(log n + k)。
+
+本模块不依赖 Flask / 数据库，索引数据由调用方从 portfolio_configs.alert_prices 构建。
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from portfolio_fields import Alert
+
+TriggeredAlert = namedtuple('TriggeredAlert', ['account_id', 'stock_code', 'alert_price', 'price', 'direction'])
+
+
+class AlertIndex:
+    """按股票代码组织的预警价有序索引（线程安全）"""
+
+    def __init__(self):
+        self._prices: Dict[str, array] = {}
+        self._accounts: Dict[str, array] = {}
+        self._by_account: Dict[int, Tuple[Alert, ...]] = {}
+        self._last_prices: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return sum(len(prices) for prices in self._prices.values())
+
+    @property
+    def account_count(self) -> int:
+        return len(self._by_account)
+
+    def build(self, entries: Iterable[Tuple[int, Iterable[Alert]]]):
+        """全量构建：entries 为 (account_id, alerts) 序列"""
+        buckets: Dict[str, List[Tuple[float, int]]] = {}
+        by_account = {}
+        for account_id, alerts in entries:
+            alerts = tuple(dict.fromkeys(alerts))
+            if not alerts:
+                continue
+            by_account[account_id] = alerts
+            for alert in alerts:
+                buckets.setdefault(alert.stock_code, []).append((alert.price, account_id))
+
+        prices = {}
+        accounts = {}
+        for code, items in buckets.items():
+            items.sort()
+            prices[code] = array('d', (price for price, _ in items))
+            accounts[code] = array('q', (account_id for _, account_id in items))
+
+        with self._lock:
+            self._prices = prices
+            self._accounts = accounts
+            self._by_account = by_account
+            self.loaded = True
+
+    def _remove(self, account_id: int, alert: Alert):
+        prices = self._prices.get(alert.stock_code)
+        if prices is None:
+            return
+        accounts = self._accounts[alert.stock_code]
+        index = bisect_left(prices, alert.price)
+        while index < len(prices) and prices[index] == alert.price:
+            if accounts[index] == account_id:
+                del prices[index]
+                del accounts[index]
+                break
+            index += 1
+        if not prices:
+            del self._prices[alert.stock_code]
+            del self._accounts[alert.stock_code]
+
+    def _insert(self, account_id: int, alert: Alert):
+        prices = self._prices.get(alert.stock_code)
+        if prices is None:
+            prices = self._prices[alert.stock_code] = array('d')
+            self._accounts[alert.stock_code] = array('q')
+        index = bisect_right(prices, alert.price)
+        prices.insert(index, alert.price)
+        self._accounts[alert.stock_code].insert(index, account_id)
+
+    def update_account(self, account_id: int, alerts: Iterable[Alert]):
+        """增量更新单个账户的预警价（只改动新旧差异部分）"""
+        new_alerts = tuple(dict.fromkeys(alerts))
+        with self._lock:
+            old_alerts = self._by_account.get(account_id, ())
+            if old_alerts == new_alerts:
+                return
+            old_set, new_set = set(old_alerts), set(new_alerts)
+            for alert in old_set - new_set:
+                self._remove(account_id, alert)
+            for alert in new_set - old_set:
+                self._insert(account_id, alert)
+            if new_alerts:
+                self._by_account[account_id] = new_alerts
+            else:
+                self._by_account.pop(account_id, None)
+
+    def remove_account(self, account_id: int):
+        self.update_account(account_id, ())
+
+    def crossed(self, stock_code: str, prev_price: float, price: float) -> List[TriggeredAlert]:
+        """返回价格从 prev_price 运动到 price 时穿越的预警"""
+        if prev_price == price:
+            return []
+        with self._lock:
+            prices = self._prices.get(stock_code)
+            if prices is None:
+                return []
+            accounts = self._accounts[stock_code]
+            if price > prev_price:
+                # 上穿：prev < 预警价 <= price
+                lo, hi = bisect_right(prices, prev_price), bisect_right(prices, price)
+                direction = 'up'
+            else:
+                # 下穿：price <= 预警价 < prev
+                lo, hi = bisect_left(prices, price), bisect_left(prices, prev_price)
+                direction = 'down'
+            if lo >= hi:
+                return []
+            hit_prices = prices[lo:hi]
+            hit_accounts = accounts[lo:hi]
+        return [
+            TriggeredAlert(account_id, stock_code, alert_price, price, direction)
+            for alert_price, account_id in zip(hit_prices, hit_accounts)
+        ]
+
+    def process_tick(self, stock_code: str, price: float) -> List[TriggeredAlert]:
+        """处理一条行情：与该股票上一条行情价比较，首条行情只记录不触发"""
+        with self._lock:
+            prev_price = self._last_prices.get(stock_code)
+            self._last_prices[stock_code] = price
+        if prev_price is None:
+            return []
+        return self.crossed(stock_code, prev_price, price)
+
+
+def parse_tick_line(line: str) -> Optional[Tuple[str, float]]:
+    """解析行情行 `stock_code,price`（忽略空行与 # 注释）"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    code, _, price = line.partition(',')
+    try:
+        return code.strip(), float(price)
+    except ValueError:
+        return None
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+预警评估引擎吞吐基准测试
+构建 100 万条预警（默认），测量索引构建耗时、行情吞吐（ticks/s）与增量更新速度
+
+    python bench_alert_engine.py --alerts 1000000 --ticks 200000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from alert_engine import AlertIndex
+from portfolio_fields import Alert, parse_alert_prices
+
+
+def generate_accounts(num_alerts: int, num_codes: int, alerts_per_account: int, seed: int = 7):
+    """生成 (account_id, alerts) 列表，走与线上相同的 alert_prices 解析流程"""
+    rng = random.Random(seed)
+    codes = [f"sh6{i:05d}" for i in range(num_codes)]
+    base_prices = {code: rng.uniform(3, 300) for code in codes}
+
+    accounts = []
+    account_id = 0
+    remaining = num_alerts
+    while remaining > 0:
+        account_id += 1
+        count = min(alerts_per_account, remaining)
+        picked = rng.sample(codes, max(1, count // 2))
+        entries = []
+        produced = 0
+        for code in picked:
+            base = base_prices[code]
+            if produced + 2 <= count:
+                entries.append(f"{base * rng.uniform(0.85, 0.98):.2f}/{base * rng.uniform(1.02, 1.15):.2f}")
+                produced += 2
+            else:
+                entries.append(f"{base * rng.uniform(0.85, 1.15):.2f}")
+                produced += 1
+        alerts = parse_alert_prices(','.join(picked), ','.join(entries))
+        accounts.append((account_id, alerts))
+        remaining -= len(alerts) or 1
+    return accounts, base_prices
+
+
+def generate_ticks(base_prices: dict, num_ticks: int, seed: int = 11):
+    """随机游走行情（每步 ±0.5% 左右）"""
+    rng = random.Random(seed)
+    prices = dict(base_prices)
+    codes = list(prices)
+    ticks = []
+    for _ in range(num_ticks):
+        code = rng.choice(codes)
+        prices[code] *= 1 + rng.gauss(0, 0.005)
+        ticks.append((code, round(prices[code], 2)))
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预警评估引擎吞吐基准测试')
+    parser.add_argument('--alerts', type=int, default=1_000_000)
+    parser.add_argument('--codes', type=int, default=5000, help='股票数量')
+    parser.add_argument('--alerts-per-account', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=200_000)
+    parser.add_argument('--updates', type=int, default=10_000, help='增量更新次数')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("预警评估引擎基准测试")
+    print("=" * 60)
+
+    accounts, base_prices = generate_accounts(args.alerts, args.codes, args.alerts_per_account)
+    ticks = generate_ticks(base_prices, args.ticks)
+    total_alerts = sum(len(alerts) for _, alerts in accounts)
+    print(f"账户数: {len(accounts)}  预警数: {total_alerts}  股票数: {args.codes}  行情数: {len(ticks)}")
+
+    index = AlertIndex()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index.build(accounts)
+    build_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\n[构建] {build_seconds:.2f}s，峰值内存 {peak / 1024 / 1024:.1f} MB，索引条目 {len(index)}")
+
+    # 预热：每只股票第一条行情只记录基准价
+    for code, price in base_prices.items():
+        index.process_tick(code, price)
+
+    hits = 0
+    start = time.perf_counter()
+    for code, price in ticks:
+        hits += len(index.process_tick(code, price))
+    elapsed = time.perf_counter() - start
+    print(f"[评估] {len(ticks)} ticks 用时 {elapsed:.2f}s → {len(ticks) / elapsed:,.0f} ticks/s，触发 {hits} 次")
+
+    rng = random.Random(3)
+    sample = rng.sample(accounts, min(args.updates, len(accounts)))
+    start = time.perf_counter()
+    for account_id, alerts in sample:
+        shifted = tuple(Alert(a.stock_code, round(a.price * 1.01, 2)) for a in alerts)
+        index.update_account(account_id, shifted)
+    elapsed = time.perf_counter() - start
+    print(f"[增量] {len(sample)} 次账户更新用时 {elapsed:.2f}s → {len(sample) / elapsed:,.0f} 次/s")
+
+
+if __name__ == '__main__':
+    main()
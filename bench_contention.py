@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+保存配置锁竞争基准
+少数热点账户、每个账户多台设备（各自的 token）同时循环保存配置，客户端遵守 503 的 retry_after，
+409 时采用服务端 revision 后重试；同时另有读线程持续读取其他（冷）账户的 /sync/version。
+请求处理线程数用信号量限制为 --server-threads（模拟 gunicorn worker 的 threads），
+排在账户锁后面的请求会占住处理线程，冷账户的读请求随之变慢。对比:
+    adaptive       默认配置（排队深度达到 SAVE_QUEUE_FAST_FAIL_DEPTH 时快速失败，retry_after 按竞争估计 + 抖动）
+    no-fast-fail   SAVE_QUEUE_FAST_FAIL_DEPTH=0（所有请求都排队等账户锁）
+输出每次保存从第一次提交到成功的耗时分位（含重试等待）、冷账户读延迟、各状态次数、retry_after 的分布
+（不同取值越多，客户端重试越分散）以及账户锁排队深度 / 等锁时间。
+每种配置在独立子进程中用 create_app(config) 创建。
+
+    python bench_contention.py --accounts 2 --devices 16 --server-threads 16 --duration 10
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from bench_load import percentile
+
+VARIANTS = {
+    'adaptive': {},
+    'no-fast-fail': {'SAVE_QUEUE_FAST_FAIL_DEPTH': 0},
+}
+
+
+def run_workload(args) -> dict:
+    """子进程：按 --config 创建应用，多设备并发保存热点账户的配置"""
+    import app as app_module
+
+    app = app_module.create_app(json.loads(args.config))
+    with app.app_context():
+        app_module.db.create_all()
+
+    client = app.test_client()
+    devices = []
+    for account in range(args.accounts):
+        username = f"bench_contention_{account}"
+        client.post('/auth/register', json={'username': username, 'password': 'bench'})
+        for _ in range(args.devices):
+            resp = client.post('/auth/login', json={'username': username, 'password': 'bench'})
+            devices.append(resp.get_json()['token']['token'])
+
+    client.post('/auth/register', json={'username': 'bench_contention_cold', 'password': 'bench'})
+    resp = client.post('/auth/login', json={'username': 'bench_contention_cold', 'password': 'bench'})
+    cold_token = resp.get_json()['token']['token']
+
+    server_threads = threading.BoundedSemaphore(args.server_threads)
+    statuses = Counter()
+    save_latencies = []
+    read_latencies = []
+    retry_afters = []
+    max_depth = 0
+    results_lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def handle(method, *args, **kwargs):
+        """占用一个处理线程执行请求"""
+        with server_threads:
+            return method(*args, **kwargs)
+
+    def device(token: str, seed: int):
+        rng = random.Random(seed)
+        thread_client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        revision = handle(thread_client.get, '/sync/version', headers=headers).get_json().get('revision', 0)
+        while time.perf_counter() < deadline:
+            payload = {'stock_codes': ','.join(f"sh60{rng.randrange(10000):04d}" for _ in range(20))}
+            started = time.perf_counter()
+            while time.perf_counter() < deadline:
+                resp = handle(thread_client.post, '/sync/config', headers=headers, json=dict(payload, revision=revision))
+                body = resp.get_json()
+                with results_lock:
+                    statuses[resp.status_code] += 1
+                if resp.status_code == 200:
+                    revision = body['config']['revision']
+                    with results_lock:
+                        save_latencies.append((time.perf_counter() - started) * 1000)
+                    break
+                if resp.status_code == 409:
+                    revision = body['server_revision']
+                elif resp.status_code == 503:
+                    with results_lock:
+                        retry_afters.append(body['retry_after'])
+                    time.sleep(body['retry_after'])
+                else:
+                    break
+            time.sleep(rng.uniform(0, args.think_ms) / 1000)
+
+    def reader():
+        thread_client = app.test_client()
+        headers = {'Authorization': f'Bearer {cold_token}'}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            handle(thread_client.get, '/sync/version', headers=headers)
+            with results_lock:
+                read_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=device, args=(token, seed)) for seed, token in enumerate(devices)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        max_depth = max(max_depth, app.extensions['ahfunstock'].save_contention.stats()['max_depth'])
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+
+    values = sorted(save_latencies)
+    reads = sorted(read_latencies)
+    contention = app.extensions['ahfunstock'].save_contention.stats()
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'saves': len(values),
+        'saves_per_s': round(len(values) / elapsed, 2),
+        'save_p50_ms': percentile(values, 50),
+        'save_p99_ms': percentile(values, 99),
+        'cold_read_p50_ms': percentile(reads, 50),
+        'cold_read_p99_ms': percentile(reads, 99),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'retry_after': {
+            'count': len(retry_afters),
+            'distinct': len(set(retry_afters)),
+            'min': min(retry_afters, default=None),
+            'median': statistics.median(retry_afters) if retry_afters else None,
+            'max': max(retry_afters, default=None),
+        },
+        'max_queue_depth': max_depth,
+        'wait_ewma_ms': contention['wait_ewma_ms'],
+        'hold_ewma_ms': contention['hold_ewma_ms'],
+        'rejected': contention['rejected'],
+        'lock_wait_timeouts': contention['lock_wait_timeouts'],
+        'wait_histogram_ms': contention['wait_histogram_ms'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='保存配置锁竞争基准')
+    parser.add_argument('--accounts', type=int, default=2, help='热点账户数')
+    parser.add_argument('--devices', type=int, default=16, help='每个账户同时保存的设备数')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--think-ms', type=float, default=20, help='两次保存之间的随机间隔上限')
+    parser.add_argument('--server-threads', type=int, default=16, help='同时处理请求的线程数')
+    parser.add_argument('--readers', type=int, default=2, help='读取冷账户的线程数')
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--config', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_workload(args)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_contention_')
+    results = {}
+    for name, variant in VARIANTS.items():
+        config = dict(
+            variant,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, name + '.db')}",
+            RATE_LIMIT_ENABLED=False,
+            RATE_LIMIT_SHM_PATH=os.path.join(workdir, 'rate_limit'),
+        )
+        print(f"运行 {name} ...", flush=True)
+        command = [sys.executable, __file__, '--child', '--config', json.dumps(config),
+                   '--accounts', str(args.accounts), '--devices', str(args.devices),
+                   '--duration', str(args.duration), '--think-ms', str(args.think_ms),
+                   '--server-threads', str(args.server_threads), '--readers', str(args.readers)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    print("=" * 120)
+    print(f"保存配置锁竞争（{args.accounts} 个账户 × {args.devices} 台设备，{args.server_threads} 个处理线程，{args.duration}s）")
+    print("=" * 120)
+    print(f"{'配置':<14} {'保存/s':>8} {'p50 ms':>9} {'p99 ms':>10} {'冷读 p99':>9} {'最大排队':>8} {'等锁 ms':>8} "
+          f"{'503':>6} {'retry_after 取值数 / 中位 / 最大':>30}  状态")
+    for name, item in results.items():
+        retry = item['retry_after']
+        print(f"{name:<14} {item['saves_per_s']:>8} {item['save_p50_ms']:>9.1f} {item['save_p99_ms']:>10.1f} "
+              f"{item['cold_read_p99_ms']:>9.1f} {item['max_queue_depth']:>8} {item['wait_ewma_ms']:>8} {retry['count']:>6} "
+              f"{str(retry['distinct']) + ' / ' + str(retry['median']) + ' / ' + str(retry['max']):>30}  {item['statuses']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': args.accounts, 'devices': args.devices, 'server_threads': args.server_threads,
+                       'duration': args.duration,
+                       'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+热点接口进程内微基准
+通过 Flask test client + SQLite 内存库直接调用 save_config / get_config / get_config_version / add_user /
+check_account_available / _authenticate_token 及 _serialize_config / _compute_config_hash，无网络、无 gunicorn，
+统计每次调用耗时、内存分配（tracemalloc）与 SQL 语句数，用于本地快速发现序列化、哈希与 ORM 开销的回归。
+
+    python bench_handlers.py --stocks 200 --iterations 500
+    python bench_handlers.py --json bench_handlers.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ.setdefault('FLASK_RATE_LIMIT_ENABLED', 'false')
+
+from sqlalchemy import event  # noqa: E402
+
+from bench_wire_format import build_portfolio  # noqa: E402
+from app import (  # noqa: E402
+    app, db, CONFIG_FIELDS, PortfolioConfig,
+    _authenticate_token, _compute_config_hash, _serialize_config,
+)
+
+
+class SqlCounter:
+    """统计执行的 SQL 语句数"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(name: str, func, iterations: int, sql: SqlCounter, alloc_iterations: int) -> dict:
+    """计时轮（不开 tracemalloc）+ 分配轮（开 tracemalloc，少量迭代）"""
+    for _ in range(min(10, iterations)):
+        func()
+
+    durations = []
+    sql_before = sql.count
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1e6)
+    statements = (sql.count - sql_before) / iterations
+
+    tracemalloc.start()
+    peaks = []
+    blocks = []
+    for _ in range(alloc_iterations):
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        peaks.append(peak - base)
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0))
+    tracemalloc.stop()
+
+    durations.sort()
+    return {
+        'name': name,
+        'iterations': iterations,
+        'mean_us': round(statistics.fmean(durations), 1),
+        'p50_us': round(durations[len(durations) // 2], 1),
+        'p95_us': round(durations[int(len(durations) * 0.95) - 1], 1),
+        'sql_per_call': round(statements, 2),
+        'peak_alloc_kb': round(statistics.median(peaks) / 1024, 1),
+        'alloc_blocks': int(statistics.median(blocks)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热点接口进程内微基准')
+    parser.add_argument('--stocks', type=int, default=200, help='配置中的股票数量')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--alloc-iterations', type=int, default=20, help='tracemalloc 统计轮次')
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        sql = SqlCounter(db.engine)
+    client = app.test_client()
+
+    client.post('/auth/register', json={'username': 'bench_handlers', 'password': 'bench'})
+    token = client.post('/auth/login', json={'username': 'bench_handlers', 'password': 'bench'}).get_json()['token']['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    portfolio = build_portfolio(args.stocks)
+    state = {'revision': 0, 'flip': 0}
+
+    def save_config():
+        # 交替修改一个字段，每次都是真实写入（非 no-change 分支）
+        state['flip'] ^= 1
+        payload = dict(portfolio, memos=portfolio['memos'] + ('|x' if state['flip'] else ''),
+                       revision=state['revision'])
+        resp = client.post('/sync/config', json=payload, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        state['revision'] = resp.get_json()['config']['revision']
+
+    def get_config():
+        assert client.get('/sync/config', headers=headers).status_code == 200
+
+    def get_config_version():
+        assert client.get('/sync/version', headers=headers).status_code == 200
+
+    def add_user():
+        # 已登记设备的启动心跳（首次调用时插入）
+        resp = client.post('/add_user', json={'machine_code': 'bench-machine', 'current_version': '3.2.0'})
+        assert resp.status_code in (200, 201), resp.get_json()
+
+    def check_account_available():
+        # 注册表单检查未被占用的用户名（由进程内预判直接回答）
+        assert client.get('/auth/available', query_string={'username': 'bench-new-user'}).status_code == 200
+
+    def authenticate_token():
+        with app.test_request_context(headers=headers):
+            assert _authenticate_token() is not None
+            db.session.remove()
+
+    save_config()
+    with app.app_context():
+        config = PortfolioConfig.query.first()
+        hash_payload = {field: getattr(config, field) or '' for field in CONFIG_FIELDS}
+
+        def serialize_config():
+            _serialize_config(config)
+
+        def compute_config_hash():
+            _compute_config_hash(hash_payload)
+
+        # 纯函数在同一应用上下文内测量，避免把上下文开销算进去
+        pure = [
+            measure('_serialize_config', serialize_config, args.iterations, sql, args.alloc_iterations),
+            measure('_compute_config_hash', compute_config_hash, args.iterations, sql, args.alloc_iterations),
+        ]
+
+    results = [
+        measure('POST /sync/config', save_config, args.iterations, sql, args.alloc_iterations),
+        measure('GET /sync/config', get_config, args.iterations, sql, args.alloc_iterations),
+        measure('GET /sync/version', get_config_version, args.iterations, sql, args.alloc_iterations),
+        measure('POST /add_user', add_user, args.iterations, sql, args.alloc_iterations),
+        measure('GET /auth/available', check_account_available, args.iterations, sql, args.alloc_iterations),
+        measure('_authenticate_token', authenticate_token, args.iterations, sql, args.alloc_iterations),
+    ] + pure
+
+    print("=" * 92)
+    print(f"热点接口微基准（{args.stocks} 只股票，{args.iterations} 次）")
+    print("=" * 92)
+    print(f"{'调用':<24} {'mean µs':>10} {'p50 µs':>10} {'p95 µs':>10} {'SQL/次':>8} {'峰值分配 KB':>12} {'分配块':>8}")
+    for item in results:
+        print(f"{item['name']:<24} {item['mean_us']:>10} {item['p50_us']:>10} {item['p95_us']:>10} "
+              f"{item['sql_per_call']:>8} {item['peak_alloc_kb']:>12} {item['alloc_blocks']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'stocks': args.stocks, 'iterations': args.iterations, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+负载测试 / 基准测试工具
+基于 asyncio + aiohttp，单进程即可维持数千并发连接；按场景生成可复现的负载（固定随机种子），
+统计每类请求的 p50 / p95 / p99 / max 延迟、吞吐与错误分布，结果保存为 JSON 便于回归对比。
+
+场景:
+    poll-heavy       大量设备轮询 /sync/version，少量拉取与保存
+    save-contention  多设备共享少量账号并发保存，观察冲突 / 合并 / 锁等待
+    login-storm      集中登录（发版后客户端同时重新登录）
+    reconcile        登录后首次对账（version → get → 云端为空时 save），--batch-sync 时合并为一次 /sync/batch
+    log-ingest       /add_user + /add_logs 批量日志洪峰
+    replay           按录制的流量（JSONL）回放，保持每个账号内的请求顺序
+
+示例:
+    python bench_load.py --url http://127.0.0.1:5000 --scenario poll-heavy --concurrency 2000 --duration 60
+    python bench_load.py --scenario replay --replay captures/traffic-*.jsonl --speed 10
+    python bench_load.py --scenario reconcile --batch-sync --output reports/reconcile-batch.json
+    python bench_load.py --compare reports/before.json reports/after.json --threshold 10
+
+注意：服务端默认开启限流（RATE_LIMITS），压测前请按需调整，否则 429 会计入错误分布。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from bench_wire_format import build_portfolio
+
+SCENARIOS = ('poll-heavy', 'save-contention', 'login-storm', 'reconcile', 'log-ingest', 'replay')
+SUCCESS_STATUSES = {200, 201, 202, 409}
+
+
+# ========== 统计 ==========
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """最近秩百分位（sorted_values 已排序）"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class OperationStats:
+    """单类请求的延迟与状态统计"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def record(self, latency_ms: float, status: Optional[int] = None, error: Optional[str] = None):
+        self.latencies.append(latency_ms)
+        if error:
+            self.errors[error] += 1
+        else:
+            self.statuses[status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        values = sorted(self.latencies)
+        failed = sum(self.errors.values()) + sum(
+            count for status, count in self.statuses.items() if status not in SUCCESS_STATUSES
+        )
+        return {
+            'count': len(values),
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else None,
+            'mean_ms': round(sum(values) / len(values), 3) if values else None,
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+            'max_ms': values[-1] if values else None,
+            'failed': failed,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'errors': dict(self.errors),
+        }
+
+
+class LoadClient:
+    """异步 HTTP 客户端，按操作名记录每次请求"""
+
+    def __init__(self, base_url: str, concurrency: int, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.stats: Dict[str, OperationStats] = defaultdict(OperationStats)
+        # 第一个计入统计的请求的开始时间（账号准备阶段不计入吞吐）
+        self.measure_start: Optional[float] = None
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+
+    async def close(self):
+        await self.session.close()
+
+    async def call(self, op: str, method: str, path: str, token: Optional[str] = None,
+                   payload=None, record: bool = True):
+        """发送请求，返回 (status, JSON 响应或 None)；网络错误时 status 为 None"""
+        headers = {'Authorization': f'Bearer {token}'} if token else None
+        start = time.perf_counter()
+        if record and self.measure_start is None:
+            self.measure_start = start
+        try:
+            async with self.session.request(method, self.base_url + path, json=payload, headers=headers) as resp:
+                body = await resp.read()
+                latency = (time.perf_counter() - start) * 1000
+                if record:
+                    self.stats[op].record(latency, status=resp.status)
+                try:
+                    return resp.status, json.loads(body) if body else None
+                except ValueError:
+                    return resp.status, None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if record:
+                self.stats[op].record((time.perf_counter() - start) * 1000, error=type(e).__name__)
+            return None, None
+
+
+# ========== 账号准备 ==========
+
+class BenchAccount:
+    __slots__ = ('username', 'password', 'token', 'revision')
+
+    def __init__(self, username: str, password: str):
+        self.username = username
+        self.password = password
+        self.token = None
+        self.revision = 0
+
+
+async def prepare_accounts(client: LoadClient, count: int, prefix: str, parallel: int = 50) -> List[BenchAccount]:
+    """注册并登录压测账号（不计入统计）"""
+    accounts = [BenchAccount(f'{prefix}_{i}', 'bench-password') for i in range(count)]
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def setup(account: BenchAccount):
+        async with semaphore:
+            await client.call('setup', 'POST', '/auth/register', record=False,
+                              payload={'username': account.username, 'password': account.password})
+            status, body = await client.call('setup', 'POST', '/auth/login', record=False,
+                                             payload={'username': account.username, 'password': account.password})
+            if status == 200 and body:
+                account.token = body['token']['token']
+                _, version = await client.call('setup', 'GET', '/sync/version', token=account.token, record=False)
+                account.revision = (version or {}).get('revision', 0) or 0
+
+    await asyncio.gather(*(setup(account) for account in accounts))
+    ready = [account for account in accounts if account.token]
+    if not ready:
+        raise SystemExit('No bench accounts could log in; is the server running?')
+    return ready
+
+
+async def save_config(client: LoadClient, account: BenchAccount, portfolio: dict, op: str = 'save_config'):
+    """保存并跟踪 revision（409 时采用服务端 revision）"""
+    status, body = await client.call(op, 'POST', '/sync/config', token=account.token,
+                                     payload=dict(portfolio, revision=account.revision))
+    if status == 200 and body and body.get('config'):
+        account.revision = body['config']['revision']
+    elif status == 409 and body:
+        account.revision = body.get('server_revision', account.revision)
+    return status
+
+
+# ========== 场景 ==========
+
+async def run_virtual_users(concurrency: int, duration: float, user_loop):
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(user_loop(index, deadline) for index in range(concurrency)))
+
+
+async def scenario_poll_heavy(client: LoadClient, args, rng: random.Random):
+    accounts = await prepare_accounts(client, args.accounts, f'{args.prefix}_poll')
+    portfolios = [build_portfolio(args.stocks, seed=i) for i in range(len(accounts))]
+
+    async def user(index: int, deadline: float):
+        user_rng = random.Random(args.seed * 100003 + index)
+        account = accounts[index % len(accounts)]
+        while time.perf_counter() < deadline:
+            roll = user_rng.random()
+            if roll < 0.90:
+                await client.call('get_version', 'GET', '/sync/version', token=account.token)
+            elif roll < 0.99:
+                await client.call('get_config', 'GET', '/sync/config', token=account.token)
+            else:
+                await save_config(client, account, portfolios[index % len(portfolios)])
+            if args.think_ms:
+                await asyncio.sleep(user_rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    await run_virtual_users(args.concurrency, args.duration, user)
+
+
+async def scenario_save_contention(client: LoadClient, args, rng: random.Random):
+    # 默认 10 个设备共享一个账号
+    accounts = await prepare_accounts(client, max(1, args.concurrency // 10), f'{args.prefix}_contention')
+
+    async def user(index: int, deadline: float):
+        user_rng = random.Random(args.seed * 100003 + index)
+        account = accounts[index % len(accounts)]
+        portfolio = build_portfolio(args.stocks, seed=index)
+        codes = portfolio['stock_codes'].split(',')
+        while time.perf_counter() < deadline:
+            _, version = await client.call('get_version', 'GET', '/sync/version', token=account.token)
+            if version:
+                account.revision = version.get('revision', account.revision) or 0
+            # 每次只改一只股票的备注，贴近真实编辑
+            memos = portfolio['memos'].split('|')
+            memos[user_rng.randrange(len(codes))] = f'device-{index}-{user_rng.randint(0, 999)}'
+            portfolio = dict(portfolio, memos='|'.join(memos))
+            await save_config(client, account, portfolio)
+            if args.think_ms:
+                await asyncio.sleep(user_rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    await run_virtual_users(args.concurrency, args.duration, user)
+
+
+async def scenario_login_storm(client: LoadClient, args, rng: random.Random):
+    accounts = await prepare_accounts(client, args.accounts, f'{args.prefix}_login')
+
+    async def user(index: int, deadline: float):
+        account = accounts[index % len(accounts)]
+        while time.perf_counter() < deadline:
+            status, body = await client.call('login', 'POST', '/auth/login',
+                                             payload={'username': account.username, 'password': account.password})
+            if status == 200 and body:
+                token = body['token']['token']
+                await client.call('get_config', 'GET', '/sync/config', token=token)
+                # 登出避免压测期间 token 无限增长
+                await client.call('logout', 'POST', '/auth/logout', token=token)
+
+    await run_virtual_users(args.concurrency, args.duration, user)
+
+
+async def scenario_reconcile(client: LoadClient, args, rng: random.Random):
+    """每次对账的总耗时记为 reconcile（不含登录 / 登出），用于对比逐个请求与 /sync/batch"""
+    accounts = await prepare_accounts(client, args.accounts, f'{args.prefix}_reconcile')
+
+    async def user(index: int, deadline: float):
+        account = accounts[index % len(accounts)]
+        portfolio = build_portfolio(args.stocks, seed=index)
+        # 本地配置与云端不同（新设备首次登录），每次对账都需要拉取配置
+        local_hash = f'{args.prefix}-local-{index}'
+        while time.perf_counter() < deadline:
+            status, body = await client.call('login', 'POST', '/auth/login',
+                                             payload={'username': account.username, 'password': account.password})
+            if status != 200 or not body:
+                continue
+            token = body['token']['token']
+            start = time.perf_counter()
+            if args.batch_sync:
+                status, _ = await client.call('sync_batch', 'POST', '/sync/batch', token=token, payload={'ops': [
+                    {'op': 'version'},
+                    {'op': 'get', 'if_none_match': local_hash},
+                    dict(portfolio, op='save', if_empty=True),
+                ]})
+            else:
+                status, version = await client.call('get_version', 'GET', '/sync/version', token=token)
+                if status == 200 and (version or {}).get('data_hash') != local_hash:
+                    status, remote = await client.call('get_config', 'GET', '/sync/config', token=token)
+                    if status == 200 and remote and remote.get('config') is None:
+                        status, _ = await client.call('save_config', 'POST', '/sync/config', token=token,
+                                                      payload=dict(portfolio, revision=0))
+            client.stats['reconcile'].record((time.perf_counter() - start) * 1000, status=status,
+                                             error=None if status else 'request_failed')
+            await client.call('logout', 'POST', '/auth/logout', token=token)
+
+    await run_virtual_users(args.concurrency, args.duration, user)
+
+
+async def scenario_log_ingest(client: LoadClient, args, rng: random.Random):
+    async def user(index: int, deadline: float):
+        user_rng = random.Random(args.seed * 100003 + index)
+        machine_code = f'{args.prefix}-machine-{index}'
+        status, body = await client.call('add_user', 'POST', '/add_user',
+                                         payload={'machine_code': machine_code, 'current_version': '3.2.0'})
+        user_id = (body or {}).get('user_id') or index + 1
+        while time.perf_counter() < deadline:
+            logs = []
+            for _ in range(args.log_batch):
+                if user_rng.random() < 0.1:
+                    logs.append({'user_id': user_id, 'error_type': user_rng.choice(['network', 'parse']),
+                                 'error_detail': 'bench', 'app_version': '3.2.0'})
+                else:
+                    logs.append({'user_id': user_id, 'action_type': user_rng.choice(['open', 'refresh', 'sync']),
+                                 'action_detail': 'bench', 'app_version': '3.2.0'})
+            await client.call('add_logs', 'POST', '/add_logs', payload={'logs': logs})
+            if args.think_ms:
+                await asyncio.sleep(user_rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    await run_virtual_users(args.concurrency, args.duration, user)
+
+
+def load_trace(paths: List[str]) -> List[dict]:
+    """
+    读取录制流量（traffic_capture.py 生成，每行 {"ts", "method", "route", "path", "account", "request_bytes", ...}）
+
+    多个文件（多个 worker / 滚动文件）合并后按时间排序。
+    """
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get('method') and record.get('route') and record.get('route') != 'unmatched':
+                    records.append(record)
+    records.sort(key=lambda record: record.get('ts', 0))
+    return records
+
+
+def synthesize_payload(record: dict, rng: random.Random, account: BenchAccount):
+    """按录制的请求大小生成等量级的请求体（录制数据不含请求内容）"""
+    size = record.get('request_bytes') or 0
+    route = record['route']
+    if record['method'] == 'GET' or not size:
+        return None
+    if route == '/auth/login':
+        return {'username': account.username, 'password': account.password}
+    if route == '/auth/register':
+        return {'username': f'{account.username}_r{rng.randrange(1 << 30)}', 'password': account.password}
+    if route == '/sync/config':
+        # 每只股票在配置中约占 60 字节
+        return build_portfolio(max(1, size // 60), seed=rng.randrange(1 << 30))
+    if route == '/add_logs':
+        return {'logs': [{'user_id': 1, 'action_type': 'replay', 'action_detail': 'replay', 'app_version': 'replay'}
+                         for _ in range(max(1, size // 90))]}
+    if route == '/add_user':
+        return {'machine_code': f'replay-{rng.randrange(1 << 30)}', 'current_version': 'replay'}
+    return {}
+
+
+async def scenario_replay(client: LoadClient, args, rng: random.Random):
+    records = load_trace(args.replay)
+    if not records:
+        raise SystemExit(f"No replayable records in {', '.join(args.replay)}")
+
+    # 每个录制账号对应一个压测账号，账号内请求串行（保持原有顺序）
+    by_account = defaultdict(list)
+    for record in records:
+        by_account[record.get('account') or 'anonymous'].append(record)
+    accounts = await prepare_accounts(client, len(by_account), f'{args.prefix}_replay')
+    account_map = dict(zip(by_account, accounts))
+    origin = records[0].get('ts', 0)
+    print(f"回放 {len(records)} 条请求，{len(by_account)} 个账号，速度 {'max' if not args.speed else f'{args.speed}x'}")
+
+    async def replay_account(key: str, account_records: List[dict]):
+        account = account_map.get(key)
+        if account is None:
+            return
+        account_rng = random.Random(f'{args.seed}:{key}')
+        for record in account_records:
+            if args.speed:
+                delay = (record.get('ts', origin) - origin) / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            payload = synthesize_payload(record, account_rng, account)
+            op = f"{record['method']} {record['route']}"
+            if record['route'] == '/sync/config' and record['method'] == 'POST':
+                await save_config(client, account, payload, op=op)
+            else:
+                path = record.get('path') or record['route']
+                await client.call(op, record['method'], path, token=account.token, payload=payload)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay_account(key, items) for key, items in by_account.items()))
+
+
+SCENARIO_RUNNERS = {
+    'poll-heavy': scenario_poll_heavy,
+    'save-contention': scenario_save_contention,
+    'login-storm': scenario_login_storm,
+    'reconcile': scenario_reconcile,
+    'log-ingest': scenario_log_ingest,
+    'replay': scenario_replay,
+}
+
+
+# ========== 报告 ==========
+
+def build_report(args, stats: Dict[str, OperationStats], elapsed: float) -> dict:
+    operations = {op: item.summary(elapsed) for op, item in sorted(stats.items())}
+    total = sum(item['count'] for item in operations.values())
+    return {
+        'scenario': args.scenario,
+        'url': args.url,
+        'started_at': datetime.utcnow().isoformat() + 'Z',
+        'params': {
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'accounts': args.accounts,
+            'stocks': args.stocks,
+            'think_ms': args.think_ms,
+            'log_batch': args.log_batch,
+            'batch_sync': args.batch_sync,
+            'seed': args.seed,
+            'replay': args.replay,
+            'speed': args.speed,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'total_requests': total,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'failed': sum(item['failed'] for item in operations.values()),
+        'operations': operations,
+    }
+
+
+def print_report(report: dict):
+    print("=" * 96)
+    print(f"场景 {report['scenario']}  用时 {report['elapsed_s']}s  请求 {report['total_requests']}  "
+          f"吞吐 {report['throughput_rps']} req/s  失败 {report['failed']}")
+    print("=" * 96)
+    print(f"{'操作':<22} {'次数':>8} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>9}  状态 / 错误")
+    for op, item in report['operations'].items():
+        detail = ' '.join(f"{status}:{count}" for status, count in item['statuses'].items())
+        if item['errors']:
+            detail += ' ' + ' '.join(f"{name}:{count}" for name, count in item['errors'].items())
+        print(f"{op:<22} {item['count']:>8} {item['throughput_rps'] or 0:>9.1f} "
+              f"{item['p50_ms'] or 0:>8.1f} {item['p95_ms'] or 0:>8.1f} {item['p99_ms'] or 0:>8.1f} "
+              f"{item['max_ms'] or 0:>9.1f}  {detail}")
+
+
+def compare_reports(base_path: str, new_path: str, threshold: float) -> int:
+    """对比两次报告，p95 / p99 变慢或吞吐下降超过 threshold% 视为回归，返回进程退出码"""
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    def change(old, current):
+        return (current - old) / old * 100 if old else 0.0
+
+    regressions = 0
+    print(f"{'操作':<22} {'p95 变化':>10} {'p99 变化':>10} {'吞吐变化':>10} {'失败':>12}")
+    for op, current in new['operations'].items():
+        old = base['operations'].get(op)
+        if not old:
+            print(f"{op:<22} {'(新增)':>10}")
+            continue
+        p95 = change(old['p95_ms'] or 0, current['p95_ms'] or 0)
+        p99 = change(old['p99_ms'] or 0, current['p99_ms'] or 0)
+        rps = change(old['throughput_rps'] or 0, current['throughput_rps'] or 0)
+        regressed = p95 > threshold or p99 > threshold or rps < -threshold or current['failed'] > old['failed']
+        regressions += regressed
+        print(f"{op:<22} {p95:>+9.1f}% {p99:>+9.1f}% {rps:>+9.1f}% {old['failed']:>5} → {current['failed']:<5}"
+              f"{'  ← 回归' if regressed else ''}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AhFunStokAPI 负载测试')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scenario', choices=SCENARIOS, default='poll-heavy')
+    parser.add_argument('--concurrency', type=int, default=200, help='虚拟用户（并发连接）数')
+    parser.add_argument('--duration', type=float, default=30, help='持续秒数（replay 场景忽略）')
+    parser.add_argument('--accounts', type=int, default=100, help='压测账号数')
+    parser.add_argument('--stocks', type=int, default=50, help='每个配置的股票数')
+    parser.add_argument('--think-ms', type=float, default=0, help='虚拟用户两次请求间的平均间隔')
+    parser.add_argument('--batch-sync', action='store_true', help='reconcile 场景用一次 /sync/batch 完成对账')
+    parser.add_argument('--log-batch', type=int, default=50, help='log-ingest 每批日志条数')
+    parser.add_argument('--replay', nargs='+', help='replay 场景的录制文件（JSONL，可传多个）')
+    parser.add_argument('--speed', type=float, default=1.0, help='回放速度倍数，0 表示不等待（最快）')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--prefix', default='loadtest', help='压测账号名前缀')
+    parser.add_argument('--output', help='报告 JSON 路径（默认 reports/<场景>-<时间>.json）')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='对比两份报告')
+    parser.add_argument('--threshold', type=float, default=10, help='回归判定阈值（百分比）')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare_reports(args.compare[0], args.compare[1], args.threshold))
+    if aiohttp is None:
+        sys.exit('bench_load.py 需要 aiohttp: pip install aiohttp')
+    if args.scenario == 'replay' and not args.replay:
+        parser.error('--scenario replay 需要 --replay 指定录制文件')
+
+    async def run():
+        client = LoadClient(args.url, args.concurrency, args.timeout)
+        try:
+            await SCENARIO_RUNNERS[args.scenario](client, args, random.Random(args.seed))
+            elapsed = time.perf_counter() - client.measure_start if client.measure_start else 0.0
+            return client.stats, elapsed
+        finally:
+            await client.close()
+
+    stats, elapsed = asyncio.run(run())
+    report = build_report(args, stats, elapsed)
+    print_report(report)
+
+    output = args.output or os.path.join('reports', f"{args.scenario}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n报告已保存: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+配置历史存储增长基准测试
+模拟真实保存频率（多数保存只改动一个字段），对比内容寻址存储与整份快照存储的字节数，
+并测量压缩（compact-config-revisions）前后的变化
+
+    python bench_revision_storage.py --accounts 50 --saves 200
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ.setdefault('FLASK_RATE_LIMIT_ENABLED', 'false')
+
+from bench_wire_format import build_portfolio  # noqa: E402
+from app import app, db, CONFIG_FIELDS, PortfolioConfigBlob, PortfolioConfigRevision  # noqa: E402
+
+
+def mutate(portfolio: dict, rng: random.Random) -> dict:
+    """按真实编辑分布改动配置：备注 > 预警价 > 持仓 > 自选列表"""
+    updated = dict(portfolio)
+    roll = rng.random()
+    if roll < 0.4:
+        memos = updated['memos'].split('|')
+        memos[rng.randrange(len(memos))] = rng.choice(['', '观察中', '已减仓', f'目标价 {rng.randint(5, 99)}'])
+        updated['memos'] = '|'.join(memos)
+    elif roll < 0.7:
+        alerts = updated['alert_prices'].split(',')
+        alerts[rng.randrange(len(alerts))] = f"{rng.uniform(5, 50):.2f}"
+        updated['alert_prices'] = ','.join(alerts)
+    elif roll < 0.9:
+        holdings = updated['holdings'].split(',')
+        holdings[rng.randrange(len(holdings))] = f"{rng.randint(1, 20) * 100}*{rng.uniform(5, 50):.3f}"
+        updated['holdings'] = ','.join(holdings)
+    else:
+        updated['pinned_stocks'] = ','.join(rng.sample(updated['stock_codes'].split(','), 5))
+    return updated
+
+
+def storage_bytes() -> dict:
+    blob_bytes = db.session.query(db.func.coalesce(db.func.sum(db.func.length(PortfolioConfigBlob.content)), 0)).scalar()
+    return {
+        'blobs': PortfolioConfigBlob.query.count(),
+        'blob_bytes': int(blob_bytes),
+        'revisions': PortfolioConfigRevision.query.count(),
+        # 每个版本行：6 个 hash + data_hash（64 字节）及少量元数据，按 500 字节估算
+        'revision_bytes': PortfolioConfigRevision.query.count() * 500,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='配置历史存储增长基准测试')
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--saves', type=int, default=200, help='每个账户的保存次数')
+    parser.add_argument('--stocks', type=int, default=200, help='每个账户的股票数量')
+    parser.add_argument('--keep', type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    rng = random.Random(2026)
+
+    print("=" * 60)
+    print(f"配置历史存储增长: {args.accounts} 账户 × {args.saves} 次保存，每账户 {args.stocks} 只股票")
+    print("=" * 60)
+
+    naive_bytes = 0
+    started = time.perf_counter()
+    for index in range(args.accounts):
+        username = f'history_bench_{index}'
+        client.post('/auth/register', json={'username': username, 'password': 'bench'})
+        token = client.post('/auth/login', json={'username': username, 'password': 'bench'}).get_json()['token']['token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        portfolio = build_portfolio(args.stocks, seed=index)
+        revision = 0
+        for _ in range(args.saves):
+            resp = client.post('/sync/config', json=dict(portfolio, revision=revision), headers=headers)
+            assert resp.status_code == 200, resp.get_json()
+            revision = resp.get_json()['config']['revision']
+            naive_bytes += sum(len(portfolio[field].encode()) for field in CONFIG_FIELDS)
+            portfolio = mutate(portfolio, rng)
+    elapsed = time.perf_counter() - started
+    total_saves = args.accounts * args.saves
+
+    with app.app_context():
+        before = storage_bytes()
+    stored = before['blob_bytes'] + before['revision_bytes']
+    print(f"\n保存 {total_saves} 次，用时 {elapsed:.1f}s（{total_saves / elapsed:.0f} 次/s）")
+    print(f"整份快照存储:   {naive_bytes / 1024 / 1024:8.2f} MB")
+    print(f"内容寻址存储:   {stored / 1024 / 1024:8.2f} MB  "
+          f"(内容 {before['blobs']} 份 {before['blob_bytes'] / 1024 / 1024:.2f} MB + 版本 {before['revisions']} 行)")
+    print(f"节省:           {(1 - stored / naive_bytes) * 100:8.1f}%")
+
+    result = app.test_cli_runner().invoke(args=[
+        'compact-config-revisions', '--keep', str(args.keep), '--blob-grace-minutes', '-1'
+    ])
+    print(f"\n压缩: {result.output.strip()}")
+    with app.app_context():
+        after = storage_bytes()
+    stored_after = after['blob_bytes'] + after['revision_bytes']
+    print(f"压缩后存储:     {stored_after / 1024 / 1024:8.2f} MB  "
+          f"(内容 {after['blobs']} 份，版本 {after['revisions']} 行)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+响应序列化基准（单线程，每核吞吐）
+在同一进程内用 Flask test client 循环请求 GET /sync/config 与 GET /sync/version（SQLite 临时库，
+大组合配置），按进程 CPU 时间计算每核 req/s，对比:
+    stdlib        FAST_JSON_ENABLED=False、ENCODED_RESPONSE_CACHE_BYTES=0（Flask 默认 JSON，每次序列化 + 压缩）
+    fast-json     orjson 编解码（未安装 orjson 时与 stdlib 相同）
+    fast-json+cache  orjson + 按 (account_id, revision, data_hash) 缓存已编码 / 压缩的响应体
+每种配置在独立子进程中用 create_app(config) 创建；--accept-encoding 模拟客户端的压缩协商。
+
+    python bench_serialization.py --stocks 500 --iterations 2000
+    python bench_serialization.py --accept-encoding identity --json bench_serialization.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_load import percentile
+from bench_wire_format import build_portfolio
+
+VARIANTS = {
+    'stdlib': {'FAST_JSON_ENABLED': False, 'ENCODED_RESPONSE_CACHE_BYTES': 0},
+    'fast-json': {'ENCODED_RESPONSE_CACHE_BYTES': 0},
+    'fast-json+cache': {},
+}
+
+ENDPOINTS = ('/sync/config', '/sync/version')
+
+
+def run_workload(args) -> dict:
+    """子进程：按 --config 创建应用，单线程循环请求各接口"""
+    import app as app_module
+    from json_provider import orjson
+
+    app = app_module.create_app(json.loads(args.config))
+    with app.app_context():
+        app_module.db.create_all()
+
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'bench_serialization', 'password': 'bench'})
+    resp = client.post('/auth/login', json={'username': 'bench_serialization', 'password': 'bench'})
+    headers = {'Authorization': f"Bearer {resp.get_json()['token']['token']}"}
+    resp = client.post('/sync/config', headers=headers, json=dict(build_portfolio(args.stocks), revision=0))
+    assert resp.status_code == 200, resp.get_json()
+    if args.accept_encoding:
+        headers['Accept-Encoding'] = args.accept_encoding
+
+    results = {}
+    for path in ENDPOINTS:
+        for _ in range(min(50, args.iterations)):
+            client.get(path, headers=headers)
+
+        latencies = []
+        body_bytes = 0
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            resp = client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            body_bytes = len(resp.get_data())
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+
+        latencies.sort()
+        results[path] = {
+            'req_per_cpu_s': round(args.iterations / cpu, 1),
+            'req_per_s': round(args.iterations / wall, 1),
+            'p50_us': percentile(latencies, 50),
+            'p99_us': percentile(latencies, 99),
+            'body_bytes': body_bytes,
+            'content_encoding': resp.headers.get('Content-Encoding'),
+        }
+
+    with app.app_context():
+        cache_stats = app_module.encoded_response_cache.stats()
+    return {'orjson': orjson is not None, 'endpoints': results, 'encoded_response_cache': cache_stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='响应序列化基准（每核吞吐）')
+    parser.add_argument('--stocks', type=int, default=500, help='配置中的股票数')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--accept-encoding', default='br, gzip', help="客户端 Accept-Encoding（identity 表示不压缩）")
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--config', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_workload(args)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_serialization_')
+    results = {}
+    for name, variant in VARIANTS.items():
+        config = dict(
+            variant,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, name + '.db')}",
+            RATE_LIMIT_ENABLED=False,
+            RATE_LIMIT_SHM_PATH=os.path.join(workdir, 'rate_limit'),
+        )
+        print(f"运行 {name} ...", flush=True)
+        command = [sys.executable, __file__, '--child', '--config', json.dumps(config),
+                   '--stocks', str(args.stocks), '--iterations', str(args.iterations),
+                   '--accept-encoding', args.accept_encoding]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results['stdlib']['endpoints']
+    print("=" * 100)
+    print(f"响应序列化（{args.stocks} 只股票，{args.iterations} 次，Accept-Encoding: {args.accept_encoding}，"
+          f"orjson {'已安装' if results['fast-json']['orjson'] else '未安装'}）")
+    print("=" * 100)
+    print(f"{'配置':<17} {'接口':<14} {'req/CPU·s':>10} {'对比 stdlib':>11} {'p50 µs':>9} {'p99 µs':>9} {'响应字节':>9}  压缩")
+    for name, item in results.items():
+        for path, stats in item['endpoints'].items():
+            speedup = stats['req_per_cpu_s'] / baseline[path]['req_per_cpu_s']
+            print(f"{name:<17} {path:<14} {stats['req_per_cpu_s']:>10} {speedup:>10.2f}x {stats['p50_us']:>9.1f} "
+                  f"{stats['p99_us']:>9.1f} {stats['body_bytes']:>9}  {stats['content_encoding'] or '-'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'stocks': args.stocks, 'iterations': args.iterations,
+                       'accept_encoding': args.accept_encoding, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+worker 启动耗时基准
+按 gunicorn / uWSGI 的 prefork 模型，测量每个 worker 从创建到处理完第一个请求（/health + /sync/version）的时间:
+    cold     每个 worker 是新进程，各自导入 app 并初始化（preload_app = False / lazy-apps=true）
+    preload  master 导入 app 并 warm_up 一次，之后 os.fork 出 worker（preload_app = True / lazy-apps=false）
+同一轮的 worker 同时创建（模拟重启时所有 worker 一起拉起），并报告每个 worker 的私有内存
+（/proc/self/smaps_rollup 的 Private_Clean + Private_Dirty），反映写时复制共享的效果。
+
+    python bench_startup.py --workers 4 --rounds 3
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def private_memory_kb():
+    """当前进程私有内存（KB），非 Linux 返回 None"""
+    try:
+        with open('/proc/self/smaps_rollup', encoding='ascii') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return None
+    return sum(int(fields[name].split()[0]) for name in ('Private_Clean', 'Private_Dirty') if name in fields)
+
+
+def first_request(app, token: str):
+    client = app.test_client()
+    assert client.get('/health').status_code == 200
+    assert client.get('/sync/version', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+
+def setup_database(token_file: str):
+    """子进程：建表并创建压测账号，把 token 写入 token_file"""
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'bench_startup', 'password': 'bench'})
+    resp = client.post('/auth/login', json={'username': 'bench_startup', 'password': 'bench'})
+    with open(token_file, 'w', encoding='utf-8') as f:
+        f.write(resp.get_json()['token']['token'])
+
+
+def cold_worker(token: str):
+    """子进程（cold）：导入 app 并处理第一个请求"""
+    start = time.perf_counter()
+    from app import app
+    imported = time.perf_counter()
+    first_request(app, token)
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_request_ms': (time.perf_counter() - imported) * 1000,
+        'done_at': time.time(),
+        'private_kb': private_memory_kb(),
+    }))
+
+
+def run_cold(workers: int, token: str) -> list:
+    started = []
+    for _ in range(workers):
+        started.append((time.time(), subprocess.Popen(
+            [sys.executable, __file__, '--cold-worker', token], stdout=subprocess.PIPE, text=True,
+        )))
+    results = []
+    for spawned_at, proc in started:
+        output, _ = proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError('cold worker failed')
+        item = json.loads(output.strip().splitlines()[-1])
+        item['ready_ms'] = (item.pop('done_at') - spawned_at) * 1000
+        results.append(item)
+    return results
+
+
+def run_preload(workers: int, token: str, master_import_ms: float) -> list:
+    """在已导入 app 的 master（当前进程）中 fork worker"""
+    import app as app_module
+
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        forked_at = time.time()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            status = 1
+            try:
+                start = time.perf_counter()
+                app_module.reset_after_fork()
+                first_request(app_module.app, token)
+                payload = json.dumps({
+                    'import_ms': 0.0,
+                    'first_request_ms': (time.perf_counter() - start) * 1000,
+                    'ready_ms': (time.time() - forked_at) * 1000,
+                    'private_kb': private_memory_kb(),
+                }).encode('utf-8')
+                os.write(write_fd, payload)
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd, 'rb') as f:
+            data = f.read()
+        _, status = os.waitpid(pid, 0)
+        if status != 0 or not data:
+            raise RuntimeError('preload worker failed')
+        item = json.loads(data)
+        item['master_import_ms'] = master_import_ms
+        results.append(item)
+    return results
+
+
+def summarize(rounds: list) -> dict:
+    items = [item for batch in rounds for item in batch]
+
+    def median(key):
+        values = [item[key] for item in items if item.get(key) is not None]
+        return round(statistics.median(values), 1) if values else None
+
+    return {
+        'workers': len(items),
+        'ready_ms_median': median('ready_ms'),
+        'ready_ms_max': round(max(item['ready_ms'] for item in items), 1),
+        'import_ms_median': median('import_ms'),
+        'first_request_ms_median': median('first_request_ms'),
+        'private_kb_median': median('private_kb'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='worker 启动耗时基准')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    parser.add_argument('--cold-worker', help=argparse.SUPPRESS)
+    parser.add_argument('--setup', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_worker:
+        cold_worker(args.cold_worker)
+        return
+    if args.setup:
+        setup_database(args.setup)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    os.environ['FLASK_RATE_LIMIT_SHM_PATH'] = os.path.join(workdir, 'rate_limit')
+    token_file = os.path.join(workdir, 'token')
+    subprocess.run([sys.executable, __file__, '--setup', token_file], check=True)
+    with open(token_file, encoding='utf-8') as f:
+        token = f.read().strip()
+
+    # cold 必须在当前进程导入 app 之前运行
+    cold = [run_cold(args.workers, token) for _ in range(args.rounds)]
+
+    start = time.perf_counter()
+    import app as app_module
+    app_module.warm_up()
+    master_import_ms = (time.perf_counter() - start) * 1000
+    gc.collect()
+    gc.freeze()
+    preload = [run_preload(args.workers, token, master_import_ms) for _ in range(args.rounds)]
+
+    results = {'cold': summarize(cold), 'preload': summarize(preload), 'master_import_ms': round(master_import_ms, 1)}
+    print("=" * 88)
+    print(f"worker 启动耗时（{args.workers} 个 worker × {args.rounds} 轮，master 导入 {master_import_ms:.1f} ms）")
+    print("=" * 88)
+    print(f"{'模式':<10} {'就绪中位 ms':>12} {'就绪最大 ms':>12} {'导入 ms':>10} {'首个请求 ms':>12} {'私有内存 KB':>12}")
+    for name in ('cold', 'preload'):
+        item = results[name]
+        print(f"{name:<10} {item['ready_ms_median']:>12} {item['ready_ms_max']:>12} {item['import_ms_median']:>10} "
+              f"{item['first_request_ms_median']:>12} {str(item['private_kb_median']):>12}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
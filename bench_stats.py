@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+统计接口基准测试
+逐步扩大原始日志规模，对比 /stats/* （查增量维护的汇总表）与等价的原始表全表聚合查询的耗时
+
+    python bench_stats.py --sizes 10000,100000,500000
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ.setdefault('FLASK_ADMIN_TOKEN', 'bench-admin-token')
+
+from sqlalchemy import text  # noqa: E402
+
+from app import (  # noqa: E402
+    app, db, ConfigAuditLog, DeviceDailyStat, ErrorLogs, User, UserActions,
+    _increment_counters, _increment_log_rollups,
+)
+
+VERSIONS = ['3.1.0', '3.1.1', '3.2.0', '3.2.1']
+ACTIONS = ['open', 'refresh', 'add_stock', 'sync']
+ERRORS = ['network', 'parse', 'crash']
+AUDIT_ACTIONS = ['read'] * 8 + ['write', 'write', 'conflict', 'merge']
+APP_TYPES = ['AhFunStock_Win', 'AhFunStock_Mac']
+
+RAW_QUERIES = {
+    'errors': [
+        "SELECT app_version, error_type, COUNT(*) FROM error_logs WHERE error_time >= :since "
+        "GROUP BY app_version, error_type",
+        "SELECT app_version, COUNT(*) FROM user_actions WHERE action_time >= :since GROUP BY app_version",
+    ],
+    'devices': [
+        "SELECT DATE(last_use_date), app_type, COUNT(*) FROM users WHERE last_use_date >= :since "
+        "GROUP BY DATE(last_use_date), app_type",
+    ],
+    'sync': [
+        "SELECT DATE(created_at), action, COUNT(*) FROM config_audit_logs WHERE created_at >= :since "
+        "GROUP BY DATE(created_at), action",
+    ],
+}
+
+
+def ingest(count: int, rng: random.Random, batch_size: int = 5000):
+    """按批写入原始日志，并用与 add_logs / add_user 相同的方式累加汇总表"""
+    now = datetime.utcnow()
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        actions, errors, audits, users, rollups = [], [], [], [], {}
+        device_rows = []
+        for _ in range(size):
+            at = now - timedelta(minutes=rng.randrange(60 * 24 * 60))
+            version = rng.choice(VERSIONS)
+            roll = rng.random()
+            if roll < 0.5:
+                action = rng.choice(ACTIONS)
+                actions.append({'user_id': 1, 'action_type': action, 'action_time': at, 'app_version': version})
+                key = (at.date(), 'action', action, version)
+            elif roll < 0.6:
+                error = rng.choice(ERRORS)
+                errors.append({'user_id': 1, 'error_type': error, 'error_time': at, 'app_version': version})
+                key = (at.date(), 'error', error, version)
+            elif roll < 0.95:
+                action = rng.choice(AUDIT_ACTIONS)
+                audits.append({'account_id': 1, 'action': action, 'created_at': at})
+                key = (at.date(), 'audit', action, '')
+            else:
+                app_type = rng.choice(APP_TYPES)
+                users.append({'machine_code': f"bench-{rng.getrandbits(64):x}", 'register_date': at,
+                              'last_use_date': at, 'use_count': 1, 'app_type': app_type})
+                device_rows.append({'day': at.date(), 'app_type': app_type, 'active_devices': 1, 'new_devices': 1})
+                continue
+            rollups[key] = rollups.get(key, 0) + 1
+
+        with db.session.begin():
+            for model, rows in ((UserActions, actions), (ErrorLogs, errors),
+                                (ConfigAuditLog, audits), (User, users)):
+                if rows:
+                    db.session.execute(db.insert(model), rows)
+            _increment_log_rollups(db.session, rollups)
+            _increment_counters(db.session, DeviceDailyStat, device_rows, ('active_devices', 'new_devices'))
+
+
+def timed(func, repeat: int) -> float:
+    """返回多次执行的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统计接口基准测试')
+    parser.add_argument('--sizes', default='10000,100000,500000', help='原始日志总行数（逐步累加）')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    headers = {'X-Admin-Token': app.config['ADMIN_TOKEN']}
+    rng = random.Random(2026)
+    since = datetime.utcnow() - timedelta(days=args.days - 1)
+
+    print("=" * 72)
+    print(f"统计接口 vs 原始表聚合（最近 {args.days} 天，中位耗时 ms）")
+    print("=" * 72)
+    print(f"{'原始行数':>10} | {'接口':<8} | {'汇总表':>10} | {'原始扫描':>10} | {'加速':>8}")
+
+    loaded = 0
+    for size in sizes:
+        with app.app_context():
+            ingest(size - loaded, rng)
+        loaded = size
+
+        for name, queries in RAW_QUERIES.items():
+            def call_endpoint():
+                resp = client.get(f'/stats/{name}?days={args.days}', headers=headers)
+                assert resp.status_code == 200, resp.get_json()
+
+            def run_raw():
+                with app.app_context():
+                    for sql in queries:
+                        db.session.execute(text(sql), {'since': since}).all()
+                    db.session.commit()
+
+            rollup_ms = timed(call_endpoint, args.repeat)
+            raw_ms = timed(run_raw, args.repeat)
+            print(f"{size:>10} | {name:<8} | {rollup_ms:>10.2f} | {raw_ms:>10.2f} | {raw_ms / rollup_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+同步接口传输格式基准测试
+对比 JSON / gzip / brotli / MessagePack 在大组合配置下的传输字节数与端到端延迟
+
+默认在进程内使用 SQLite 内存库 + Flask test client 运行（无需启动服务）:
+    python bench_wire_format.py --stocks 300 1000 3000
+
+也可以指定已启动的服务地址（需要已注册的账号）:
+    python bench_wire_format.py --url http://127.0.0.1:5000 --username bench --password bench
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import time
+import urllib.request
+
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', 'sqlite://')
+os.environ.setdefault('FLASK_RATE_LIMIT_ENABLED', 'false')
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def build_portfolio(num_stocks: int, seed: int = 42) -> dict:
+    """生成贴近真实的大组合配置（字段格式与客户端一致）"""
+    rng = random.Random(seed)
+    codes = []
+    for _ in range(num_stocks):
+        market = rng.choice(['sh60', 'sz00', 'sz30', 'hk0'])
+        codes.append(f"{market}{rng.randint(0, 9999):04d}")
+
+    holdings = []
+    alerts = []
+    memos = []
+    for _ in codes:
+        if rng.random() < 0.6:
+            holdings.append(f"{rng.randint(1, 50) * 100}*{rng.uniform(2, 200):.3f}")
+        else:
+            holdings.append('')
+        if rng.random() < 0.4:
+            base = rng.uniform(2, 200)
+            alerts.append(f"{base * 0.9:.2f}/{base * 1.1:.2f}")
+        else:
+            alerts.append('')
+        memos.append(rng.choice(['', '长期持有', '观察中', '等回调再加仓', '分红再投资', '止损位参考']))
+
+    return {
+        'stock_codes': ','.join(codes),
+        'memos': '|'.join(memos),
+        'holdings': ','.join(holdings),
+        'alert_prices': ','.join(alerts),
+        'index_codes': 'sh000001,sz399001,sz399006,sh000300',
+        'pinned_stocks': ','.join(codes[:10]),
+    }
+
+
+VARIANTS = [
+    # (名称, Accept, Accept-Encoding)
+    ('json', 'application/json', 'identity'),
+    ('json+gzip', 'application/json', 'gzip'),
+    ('json+br', 'application/json', 'br'),
+    ('msgpack', 'application/msgpack', 'identity'),
+    ('msgpack+gzip', 'application/msgpack', 'gzip'),
+    ('msgpack+br', 'application/msgpack', 'br'),
+]
+
+
+def _variant_supported(accept: str, encoding: str) -> bool:
+    if 'msgpack' in accept and msgpack is None:
+        return False
+    if encoding == 'br' and brotli is None:
+        return False
+    return True
+
+
+def _decode(body: bytes, content_type: str, content_encoding: str):
+    if content_encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif content_encoding == 'br':
+        body = brotli.decompress(body)
+    if 'msgpack' in content_type:
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+class InProcessTransport:
+    """通过 Flask test client 调用（WSGI 层端到端，不含网络）"""
+
+    def __init__(self):
+        from app import app, db
+        self.app = app
+        with app.app_context():
+            db.create_all()
+        self.client = app.test_client()
+        self.client.post('/auth/register', json={'username': 'bench', 'password': 'bench'})
+        resp = self.client.post('/auth/login', json={'username': 'bench', 'password': 'bench'})
+        self.token = resp.get_json()['token']['token']
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None):
+        headers = {'Authorization': f'Bearer {self.token}', **(headers or {})}
+        resp = self.client.open(path, method=method, data=body, headers=headers)
+        return resp.status_code, resp.data, resp.headers
+
+
+class HttpTransport:
+    """通过 HTTP 调用已启动的服务"""
+
+    def __init__(self, base_url: str, username: str, password: str):
+        self.base_url = base_url.rstrip('/')
+        _, body, _ = self.request('POST', '/auth/login',
+                                  json.dumps({'username': username, 'password': password}).encode(),
+                                  {'Content-Type': 'application/json'}, auth=False)
+        self.token = json.loads(body)['token']['token']
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None, auth: bool = True):
+        headers = dict(headers or {})
+        if auth:
+            headers['Authorization'] = f'Bearer {self.token}'
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.status, resp.read(), resp.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers
+
+
+def _current_revision(transport) -> int:
+    _, body, _ = transport.request('GET', '/sync/version')
+    return json.loads(body).get('revision', 0)
+
+
+def bench_get(transport, iterations: int):
+    print(f"\n  GET /sync/config ({iterations} 次)")
+    print(f"  {'格式':<14}{'字节数':>10}{'压缩比':>8}{'p50(ms)':>10}{'p95(ms)':>10}")
+    baseline = None
+    for name, accept, encoding in VARIANTS:
+        if not _variant_supported(accept, encoding):
+            print(f"  {name:<14}{'(未安装依赖，跳过)':>10}")
+            continue
+        headers = {'Accept': accept, 'Accept-Encoding': encoding}
+        latencies = []
+        size = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            status, body, resp_headers = transport.request('GET', '/sync/config', headers=headers)
+            _decode(body, resp_headers.get('Content-Type', ''), resp_headers.get('Content-Encoding', ''))
+            latencies.append((time.perf_counter() - start) * 1000)
+            size = len(body)
+            assert status == 200, status
+        baseline = baseline or size
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"  {name:<14}{size:>10}{baseline / size:>8.1f}{statistics.median(latencies):>10.2f}{p95:>10.2f}")
+
+
+def bench_post(transport, portfolio: dict, iterations: int):
+    print(f"\n  POST /sync/config ({iterations} 次)")
+    print(f"  {'请求体编码':<14}{'字节数':>10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    encoders = [
+        ('json', 'application/json', None, lambda d: json.dumps(d).encode()),
+        ('json+gzip', 'application/json', 'gzip', lambda d: gzip.compress(json.dumps(d).encode())),
+    ]
+    if brotli is not None:
+        encoders.append(('json+br', 'application/json', 'br', lambda d: brotli.compress(json.dumps(d).encode(), quality=5)))
+    if msgpack is not None:
+        encoders.append(('msgpack', 'application/msgpack', None, lambda d: msgpack.packb(d)))
+        encoders.append(('msgpack+gzip', 'application/msgpack', 'gzip', lambda d: gzip.compress(msgpack.packb(d))))
+
+    for name, content_type, encoding, encode in encoders:
+        latencies = []
+        size = 0
+        for i in range(iterations):
+            payload = dict(portfolio, revision=_current_revision(transport), memos=portfolio['memos'] + f'|{i}')
+            body = encode(payload)
+            headers = {'Content-Type': content_type}
+            if encoding:
+                headers['Content-Encoding'] = encoding
+            start = time.perf_counter()
+            status, _, _ = transport.request('POST', '/sync/config', body=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            size = len(body)
+            assert status == 200, status
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"  {name:<14}{size:>10}{statistics.median(latencies):>10.2f}{p95:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='同步接口传输格式基准测试')
+    parser.add_argument('--stocks', type=int, nargs='+', default=[100, 1000, 3000], help='组合规模（股票数量）')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--url', help='已启动服务的地址，不指定则进程内测试')
+    parser.add_argument('--username', default='bench')
+    parser.add_argument('--password', default='bench')
+    args = parser.parse_args()
+
+    if args.url:
+        transport = HttpTransport(args.url, args.username, args.password)
+    else:
+        transport = InProcessTransport()
+
+    print("=" * 60)
+    print("同步接口传输格式基准测试")
+    print(f"brotli: {'可用' if brotli else '未安装'}  msgpack: {'可用' if msgpack else '未安装'}")
+    print("=" * 60)
+
+    for num_stocks in args.stocks:
+        portfolio = build_portfolio(num_stocks)
+        raw_size = sum(len(v.encode()) for v in portfolio.values())
+        print(f"\n[组合规模 {num_stocks} 只股票，原始字段 {raw_size} 字节]")
+        payload = dict(portfolio, revision=_current_revision(transport))
+        status, _, _ = transport.request('POST', '/sync/config', body=json.dumps(payload).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        assert status == 200, status
+        bench_post(transport, portfolio, args.iterations)
+        bench_get(transport, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
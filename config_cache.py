@@ -0,0 +1,127 @@
+"""
+解析后配置的进程级缓存
+
+以 data_hash（配置内容摘要）为键缓存不可变的 ParsedConfig。
+data_hash 随内容变化，缓存项永远不需要失效，只按占用内存做 LRU 淘汰。
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from portfolio_fields import (
+    Alert,
+    Holding,
+    parse_alert_prices,
+    parse_holdings,
+    split_codes,
+    split_positional,
+)
+from portfolio_valuation import HoldingColumns
+
+
+class ParsedConfig:
+    """解析后的组合配置（只读）"""
+    __slots__ = ('stock_codes', 'pinned_stocks', 'index_codes', 'holdings',
+                 'alerts', 'memos', 'holding_columns', 'nbytes')
+
+    stock_codes: Tuple[str, ...]
+    pinned_stocks: Tuple[str, ...]
+    index_codes: Tuple[str, ...]
+    holdings: Tuple[Holding, ...]
+    alerts: Tuple[Alert, ...]
+    memos: Tuple[Tuple[str, str], ...]
+    holding_columns: HoldingColumns
+    nbytes: int
+
+    def __init__(self, stock_codes: Optional[str], memos: Optional[str], holdings: Optional[str],
+                 alert_prices: Optional[str], index_codes: Optional[str], pinned_stocks: Optional[str]):
+        setter = object.__setattr__
+        parsed_holdings = parse_holdings(stock_codes, holdings)
+        setter(self, 'stock_codes', split_codes(stock_codes))
+        setter(self, 'pinned_stocks', split_codes(pinned_stocks))
+        setter(self, 'index_codes', split_codes(index_codes))
+        setter(self, 'holdings', parsed_holdings)
+        setter(self, 'alerts', parse_alert_prices(stock_codes, alert_prices))
+        setter(self, 'memos', tuple(
+            (code, memo) for code, memo in zip(split_positional(stock_codes), split_positional(memos, '|'))
+            if code and memo
+        ))
+        setter(self, 'holding_columns', HoldingColumns(parsed_holdings))
+        setter(self, 'nbytes', self._estimate_size())
+
+    @classmethod
+    def from_config(cls, config) -> 'ParsedConfig':
+        return cls(config.stock_codes, config.memos, config.holdings,
+                   config.alert_prices, config.index_codes, config.pinned_stocks)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ParsedConfig is immutable')
+
+    def _estimate_size(self) -> int:
+        """估算占用内存（字符串 + 元组 + 数组），用于按大小淘汰"""
+        size = sys.getsizeof(self)
+        for codes in (self.stock_codes, self.pinned_stocks, self.index_codes):
+            size += sys.getsizeof(codes) + sum(sys.getsizeof(code) for code in codes)
+        for records in (self.holdings, self.alerts, self.memos):
+            size += sys.getsizeof(records)
+            for record in records:
+                size += sys.getsizeof(record) + sum(sys.getsizeof(item) for item in record)
+        for column in (self.holding_columns.codes, self.holding_columns.shares, self.holding_columns.cost_price):
+            size += getattr(column, 'nbytes', 0) or sys.getsizeof(column)
+        return size
+
+
+class ParsedConfigCache:
+    """data_hash → ParsedConfig 的 LRU 缓存，按估算内存占用淘汰（线程安全）"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, config) -> ParsedConfig:
+        """返回配置的解析结果；config 需提供六个配置字段与 data_hash"""
+        key = config.data_hash
+        if key:
+            with self._lock:
+                parsed = self._entries.get(key)
+                if parsed is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return parsed
+
+        parsed = ParsedConfig.from_config(config)
+        if not key:
+            return parsed
+
+        with self._lock:
+            self.misses += 1
+            if key in self._entries or parsed.nbytes > self.max_bytes:
+                return self._entries.get(key, parsed)
+            self._entries[key] = parsed
+            self.current_bytes += parsed.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+        return parsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
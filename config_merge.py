@@ -0,0 +1,115 @@
+"""
+配置三方合并
+
+以客户端提交时所基于的历史版本（base）为共同祖先，合并客户端（ours）与服务端最新（theirs）:
+- stock_codes / pinned_stocks / index_codes 视为有序集合，双方的增删都保留，不会冲突
+- holdings / alert_prices / memos 视为以股票代码为键的映射（与各自版本的 stock_codes 按位置对应），
+  同一股票被双方改成不同值，或一方删除了股票而另一方修改了它的值时算冲突
+
+字段无法可靠按位置映射（条目数多于股票数、股票代码重复）时退化为整字段比较。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from portfolio_fields import split_positional
+
+ORDERED_SET_FIELDS = ('stock_codes', 'pinned_stocks', 'index_codes')
+KEYED_FIELDS = {
+    'holdings': ',',
+    'alert_prices': ',',
+    'memos': '|',
+}
+
+
+def _merge_value(base, ours, theirs) -> Tuple[object, bool]:
+    """单值三方合并，返回 (结果, 是否冲突)"""
+    if ours == theirs:
+        return ours, False
+    if ours == base:
+        return theirs, False
+    if theirs == base:
+        return ours, False
+    return None, True
+
+
+def _code_list(value: str) -> List[str]:
+    return [code.strip() for code in (value or '').split(',') if code.strip()]
+
+
+def merge_ordered_set(base: str, ours: str, theirs: str) -> str:
+    """有序集合合并：以服务端顺序为主，追加客户端新增项，双方删除项都生效"""
+    if ours == base:
+        return theirs
+    if theirs == base or ours == theirs:
+        return ours
+
+    base_items, our_items, their_items = _code_list(base), _code_list(ours), _code_list(theirs)
+    base_set, our_set, their_set = set(base_items), set(our_items), set(their_items)
+    removed = (base_set - our_set) | (base_set - their_set)
+
+    result = [item for item in dict.fromkeys(their_items) if item not in removed]
+    present = set(result)
+    for item in our_items:
+        if item not in base_set and item not in present:
+            result.append(item)
+            present.add(item)
+    return ','.join(result)
+
+
+def _keyed_map(codes_value: str, field_value: str, separator: str) -> Optional[Dict[str, str]]:
+    """把按位置对应的字段转为 {股票代码: 值}，无法可靠映射时返回 None"""
+    codes = split_positional(codes_value)
+    entries = split_positional(field_value, separator)
+    named_codes = [code for code in codes if code]
+    if len(entries) > len(codes) or len(set(named_codes)) != len(named_codes):
+        return None
+    return {code: entry for code, entry in zip(codes, entries) if code and entry}
+
+
+def merge_configs(base: dict, ours: dict, theirs: dict) -> Tuple[dict, List[dict]]:
+    """
+    三方合并六个配置字段
+
+    返回 (merged, conflicts)，conflicts 为 [{'field': ..., 'key': ...}]，为空表示合并成功；
+    一方删除股票、另一方修改其值的冲突带 'deleted': True。
+    """
+    base = {field: base.get(field) or '' for field in ORDERED_SET_FIELDS + tuple(KEYED_FIELDS)}
+    ours = {field: ours.get(field) or '' for field in base}
+    theirs = {field: theirs.get(field) or '' for field in base}
+
+    merged = {}
+    conflicts = []
+    for field in ORDERED_SET_FIELDS:
+        merged[field] = merge_ordered_set(base[field], ours[field], theirs[field])
+
+    merged_codes = _code_list(merged['stock_codes'])
+    for field, separator in KEYED_FIELDS.items():
+        maps = [_keyed_map(version['stock_codes'], version[field], separator) for version in (base, ours, theirs)]
+        if any(m is None for m in maps):
+            value, conflicted = _merge_value(base[field], ours[field], theirs[field])
+            if conflicted:
+                conflicts.append({'field': field, 'key': None})
+            else:
+                merged[field] = value
+            continue
+
+        base_map, our_map, their_map = maps
+        values = {}
+        for code in merged_codes:
+            value, conflicted = _merge_value(base_map.get(code), our_map.get(code), their_map.get(code))
+            if conflicted:
+                conflicts.append({'field': field, 'key': code})
+            elif value:
+                values[code] = value
+
+        # 被一方删除的股票：另一方修改过的值会随删除丢失，作为冲突返回
+        dropped = (set(our_map) | set(their_map)) - set(merged_codes)
+        for code in sorted(dropped):
+            base_value = base_map.get(code)
+            if any(side.get(code) is not None and side.get(code) != base_value for side in (our_map, their_map)):
+                conflicts.append({'field': field, 'key': code, 'deleted': True})
+
+        entries = [values.get(code, '') for code in merged_codes]
+        merged[field] = separator.join(entries) if values else ''
+
+    return merged, conflicts
@@ -0,0 +1,166 @@
+"""
+保存配置的锁竞争统计
+
+记录每个账户（与全局）在 get_account_lock 后排队的请求数、等锁时间与持锁时间（指数滑动平均），
+等锁时间分布（直方图）以及锁等待超时的频率，用于:
+- 计算 503 的 retry_after: 估计排在前面的请求执行完所需时间，再加随机抖动，避免客户端同步重试
+- 快速失败: 账户排队已经很深时，新的保存请求不再排队等锁
+- 限时等锁: 超过等待时间仍未拿到锁时放弃（LockWaitTimeout），不让一个慢提交占住 worker 的全部线程
+
+计数只在进程内有效（与 get_account_lock 相同）。
+"""
+
+import bisect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Hashable, Optional
+
+# 等锁时间直方图的桶上界（毫秒），最后一个桶为超过最大上界
+WAIT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LockWaitTimeout(Exception):
+    """等待超过 timeout 仍未获得锁"""
+
+
+class _Entry:
+    __slots__ = ('waiting', 'holding', 'wait_ewma', 'hold_ewma')
+
+    def __init__(self):
+        self.waiting = 0
+        self.holding = False
+        self.wait_ewma = 0.0
+        self.hold_ewma = 0.0
+
+
+def _ewma(current: float, sample: float, alpha: float) -> float:
+    return sample if current == 0.0 else current + alpha * (sample - current)
+
+
+class ContentionTracker:
+    """按键（账户）统计锁排队深度与等待 / 持有时间（线程安全）"""
+
+    def __init__(self, alpha: float = 0.2, pressure_half_life: float = 10.0):
+        self.alpha = alpha
+        self.pressure_half_life = pressure_half_life
+        self.waiting = 0
+        self.wait_ewma = 0.0
+        self.hold_ewma = 0.0
+        self.lock_timeouts = 0
+        self.lock_wait_timeouts = 0
+        self.acquired = 0
+        self.rejected = 0
+        self._wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pressure = 0.0
+        self._pressure_at = time.monotonic()
+
+    def queue_depth(self, key: Hashable) -> int:
+        """当前在该键的锁后面排队的请求数（不含持锁者）"""
+        entry = self._entries.get(key)
+        return entry.waiting if entry is not None else 0
+
+    @contextmanager
+    def acquire(self, key: Hashable, lock: threading.Lock, timeout: Optional[float] = None):
+        """
+        获取 lock 并在退出时释放，同时记录排队、等锁与持锁时间；
+        timeout 秒内未获得锁时抛出 LockWaitTimeout（None 表示一直等待）
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.waiting += 1
+            self.waiting += 1
+
+        start = time.monotonic()
+        acquired = False
+        try:
+            acquired = lock.acquire(timeout=-1 if timeout is None else timeout)
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                entry.waiting -= 1
+                self.waiting -= 1
+                self._wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, waited * 1000)] += 1
+                if acquired:
+                    self.acquired += 1
+                    entry.holding = True
+                    entry.wait_ewma = _ewma(entry.wait_ewma, waited, self.alpha)
+                    self.wait_ewma = _ewma(self.wait_ewma, waited, self.alpha)
+                else:
+                    self.lock_wait_timeouts += 1
+                    self._pressure = self._decayed_pressure() + 1.0
+                    self._release_entry(key, entry)
+        if not acquired:
+            raise LockWaitTimeout(f'lock wait exceeded {timeout}s')
+
+        held_since = time.monotonic()
+        try:
+            yield
+        finally:
+            lock.release()
+            held = time.monotonic() - held_since
+            with self._lock:
+                entry.holding = False
+                entry.hold_ewma = _ewma(entry.hold_ewma, held, self.alpha)
+                self.hold_ewma = _ewma(self.hold_ewma, held, self.alpha)
+                self._release_entry(key, entry)
+
+    def record_lock_timeout(self, key: Hashable):
+        """数据库锁等待超时（与等锁超时一样计入压力，压力按半衰期衰减，用于放大 retry_after）"""
+        with self._lock:
+            self.lock_timeouts += 1
+            self._pressure = self._decayed_pressure() + 1.0
+
+    def record_rejected(self, key: Hashable):
+        with self._lock:
+            self.rejected += 1
+
+    def retry_after(self, key: Hashable, minimum: float, maximum: float,
+                    rng: Optional[random.Random] = None) -> float:
+        """
+        建议的重试等待秒数: 排队请求数 × 平均持锁时间，按近期锁超时压力放大，
+        再在 [估计值, 2 × 估计值] 内随机（估计值限制在 [minimum, maximum / 2]）
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            depth = (entry.waiting + entry.holding) if entry is not None else 0
+            hold = entry.hold_ewma if entry is not None and entry.hold_ewma else self.hold_ewma
+            pressure = self._decayed_pressure()
+        estimate = min(max(minimum, depth * hold * (1.0 + pressure)), maximum / 2)
+        return round((rng or random).uniform(estimate, 2 * estimate), 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'waiting': self.waiting,
+                'contended_keys': sum(1 for entry in self._entries.values() if entry.waiting),
+                'max_depth': max((entry.waiting for entry in self._entries.values()), default=0),
+                'wait_ewma_ms': round(self.wait_ewma * 1000, 2),
+                'hold_ewma_ms': round(self.hold_ewma * 1000, 2),
+                'acquired': self.acquired,
+                'lock_wait_timeouts': self.lock_wait_timeouts,
+                'lock_timeouts': self.lock_timeouts,
+                'rejected': self.rejected,
+                'wait_histogram_ms': self._histogram(),
+                'pressure': round(self._decayed_pressure(), 3),
+            }
+
+    def _histogram(self) -> dict:
+        """counts[i] 为等待时间不超过 le_ms[i] 的次数（不累计），最后一项为超过最大上界（调用方持有 self._lock）"""
+        return {'le_ms': list(WAIT_BUCKETS_MS) + [None], 'counts': list(self._wait_histogram)}
+
+    def _release_entry(self, key: Hashable, entry: _Entry):
+        """没有排队者与持锁者时删除条目（调用方持有 self._lock）"""
+        if entry.waiting == 0 and not entry.holding and self._entries.get(key) is entry:
+            del self._entries[key]
+
+    def _decayed_pressure(self) -> float:
+        now = time.monotonic()
+        self._pressure *= 0.5 ** ((now - self._pressure_at) / self.pressure_half_life)
+        self._pressure_at = now
+        return self._pressure
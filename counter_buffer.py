@@ -0,0 +1,46 @@
+"""
+进程内计数缓冲
+
+高频事件（如每次读取配置的审计日志）逐条更新汇总表会让同一汇总行成为行锁热点，
+先在内存中按键累加，到期后由调用方一次性批量写入。
+进程异常退出会丢失未写入的计数，可由 rollup-logs 从原始日志重算修正。
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Hashable
+
+
+class CounterBuffer:
+    """按键累加的计数缓冲（线程安全）"""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: Hashable, amount: int = 1):
+        with self._lock:
+            self._counts[key] += amount
+
+    def due(self) -> bool:
+        return bool(self._counts) and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def drain(self, force: bool = False) -> Dict[Hashable, int]:
+        """取出并清空累计值；未到期且非强制时返回空字典"""
+        if not force and not self.due():
+            return {}
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._last_flush = time.monotonic()
+        return dict(counts)
+
+    def restore(self, counts: Dict[Hashable, int]):
+        """写入失败时把取出的计数放回，下次再写"""
+        with self._lock:
+            self._counts.update(counts)
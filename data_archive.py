@@ -0,0 +1,129 @@
+"""
+数据归档格式（导出 / 导入）
+
+gzip 压缩的 NDJSON，按块写入：每块是一个独立的 gzip member（多 member 拼接仍是合法 gzip 文件），
+写入和读取都只在内存中保留一块数据。
+
+行格式:
+- {"archive": "ahfunstock", "version": 1, "created_at": ...}   文件头
+- {"table": "accounts", "columns": [...]}                       表开始
+- [value, value, ...]                                           数据行（与 columns 对应）
+- {"end": "accounts", "rows": N}                                表结束（用于校验完整性）
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ARCHIVE_NAME = 'ahfunstock'
+ARCHIVE_VERSION = 1
+
+
+class ArchiveError(Exception):
+    """归档文件格式错误或不完整"""
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class ArchiveWriter:
+    """按块写入归档文件"""
+
+    def __init__(self, fileobj, compresslevel: int = 6):
+        self._fileobj = fileobj
+        self._compresslevel = compresslevel
+        self._buffer = bytearray()
+        self._write_member(_dumps({
+            'archive': ARCHIVE_NAME,
+            'version': ARCHIVE_VERSION,
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+        }))
+
+    def _write_member(self, data: bytes):
+        self._fileobj.write(gzip.compress(bytes(data), compresslevel=self._compresslevel))
+
+    def write_table(self, name: str, columns: Sequence[str], chunks: Iterable[Sequence[Sequence]]) -> int:
+        """写入一张表，chunks 为按块产出的行序列；返回行数"""
+        rows = 0
+        buffer = bytearray(_dumps({'table': name, 'columns': list(columns)}))
+        for chunk in chunks:
+            for row in chunk:
+                buffer += _dumps([_encode_value(value) for value in row])
+                rows += 1
+            self._write_member(buffer)
+            buffer = bytearray()
+        buffer += _dumps({'end': name, 'rows': rows})
+        self._write_member(buffer)
+        return rows
+
+
+class ArchiveTable:
+    """读取中的一张表，rows 只能迭代一次"""
+
+    def __init__(self, name: str, columns: List[str], lines: Iterator[bytes]):
+        self.name = name
+        self.columns = columns
+        self._lines = lines
+        self.row_count = 0
+
+    def batches(self, batch_size: int) -> Iterator[List[list]]:
+        """按 batch_size 分批产出行，读到表结束标记并校验行数"""
+        batch = []
+        for line in self._lines:
+            item = json.loads(line)
+            if isinstance(item, list):
+                batch.append(item)
+                self.row_count += 1
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                continue
+            if item.get('end') != self.name:
+                raise ArchiveError(f"unexpected record inside table {self.name}: {line[:80]!r}")
+            if item.get('rows') != self.row_count:
+                raise ArchiveError(f"table {self.name} row count mismatch: "
+                                   f"expected {item.get('rows')}, read {self.row_count}")
+            if batch:
+                yield batch
+            return
+        raise ArchiveError(f"archive truncated inside table {self.name}")
+
+
+def read_archive(fileobj) -> Iterator[ArchiveTable]:
+    """逐表读取归档文件；调用方必须在取下一张表之前消费完当前表的 batches()"""
+    lines = (line for line in gzip.GzipFile(fileobj=fileobj, mode='rb') if line.strip())
+    header: Optional[dict] = None
+    try:
+        header = json.loads(next(lines))
+    except StopIteration:
+        pass
+    if not isinstance(header, dict) or header.get('archive') != ARCHIVE_NAME:
+        raise ArchiveError('not an ahfunstock archive')
+    if header.get('version') != ARCHIVE_VERSION:
+        raise ArchiveError(f"unsupported archive version {header.get('version')}")
+
+    for line in lines:
+        item = json.loads(line)
+        if not isinstance(item, dict) or 'table' not in item:
+            raise ArchiveError(f"expected table header, got {line[:80]!r}")
+        yield ArchiveTable(item['table'], item['columns'], lines)
+
+
+def decode_row(values: Sequence, datetime_indexes: Tuple[int, ...]) -> list:
+    """把导出的 ISO 时间字符串还原为 datetime"""
+    row = list(values)
+    for index in datetime_indexes:
+        value = row[index]
+        if isinstance(value, str):
+            row[index] = datetime.fromisoformat(value)
+    return row
@@ -0,0 +1,131 @@
+"""
+设备心跳写合并
+
+客户端每次启动都会调用 /add_user，逐次加锁读取并更新 users 的 use_count / last_use_date 会让设备行成为写热点:
+- (machine_code, app_type) → user_id 缓存在进程内（LRU，上限 max_entries），已登记的设备直接返回 user_id
+- 已登记设备的使用次数、最后使用时间 / IP / 版本在内存中按 user_id 累加，到期后由调用方一次性批量 UPDATE
+- 新设备仍由调用方同步插入（需要立即返回 user_id），插入后加入缓存
+
+进程异常退出会丢失未写入的心跳（use_count 少计、last_use_date 略旧），设备登记本身不受影响。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class Heartbeat:
+    """一台设备在两次写入之间累计的使用记录"""
+    __slots__ = ('app_type', 'count', 'last_use', 'last_use_ip', 'current_version', 'days')
+
+    def __init__(self, app_type: Optional[str]):
+        self.app_type = app_type
+        self.count = 0
+        self.last_use: Optional[datetime] = None
+        self.last_use_ip: Optional[str] = None
+        self.current_version: Optional[str] = None
+        # 有使用记录的日期（用于计入每日活跃设备）
+        self.days = set()
+
+    def merge(self, other: 'Heartbeat'):
+        """合并另一份累计（较新的最后使用时间 / IP / 版本优先）"""
+        self.count += other.count
+        self.days |= other.days
+        if self.last_use is None or (other.last_use is not None and other.last_use > self.last_use):
+            self.last_use = other.last_use
+            self.last_use_ip = other.last_use_ip or self.last_use_ip
+            self.current_version = other.current_version or self.current_version
+        else:
+            self.last_use_ip = self.last_use_ip or other.last_use_ip
+            self.current_version = self.current_version or other.current_version
+
+
+class DeviceRegistry:
+    """设备 user_id 缓存 + 心跳累加缓冲（线程安全）"""
+
+    def __init__(self, flush_interval: float, max_entries: int):
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+        self._pending: Dict[int, Heartbeat] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def lookup(self, machine_code: str, app_type: Optional[str]) -> Optional[int]:
+        """已缓存设备的 user_id，未缓存返回 None（max_entries 为 0 时不缓存）"""
+        key = (machine_code, app_type)
+        with self._lock:
+            user_id = self._ids.get(key)
+            if user_id is None:
+                self.misses += 1
+                return None
+            self._ids.move_to_end(key)
+            self.hits += 1
+            return user_id
+
+    def remember(self, machine_code: str, app_type: Optional[str], user_id: int):
+        if self.max_entries <= 0:
+            return
+        key = (machine_code, app_type)
+        with self._lock:
+            self._ids[key] = user_id
+            self._ids.move_to_end(key)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def record(self, user_id: int, app_type: Optional[str], used_at: datetime,
+               last_use_ip: Optional[str] = None, current_version: Optional[str] = None):
+        """累加一次使用（不写数据库）"""
+        beat = Heartbeat(app_type)
+        beat.count = 1
+        beat.last_use = used_at
+        beat.last_use_ip = last_use_ip
+        beat.current_version = current_version
+        beat.days.add(used_at.date())
+        with self._lock:
+            current = self._pending.get(user_id)
+            if current is None:
+                self._pending[user_id] = beat
+            else:
+                current.merge(beat)
+
+    def due(self) -> bool:
+        return bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def drain(self, force: bool = False) -> Dict[int, Heartbeat]:
+        """取出并清空累计的心跳；未到期且非强制时返回空字典"""
+        if not force and not self.due():
+            return {}
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        return pending
+
+    def restore(self, pending: Dict[int, Heartbeat]):
+        """写入失败时把取出的心跳放回，下次再写"""
+        with self._lock:
+            for user_id, beat in pending.items():
+                current = self._pending.get(user_id)
+                if current is None:
+                    self._pending[user_id] = beat
+                else:
+                    current.merge(beat)
+
+    def stats(self) -> dict:
+        return {
+            'cached_devices': len(self._ids),
+            'pending_heartbeats': len(self._pending),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,36 @@
+-- 2026-10-18 新增配置历史版本（内容寻址存储）
+-- portfolio_config_blobs 按字段内容 sha256 去重存储；portfolio_config_revisions 只记录各字段的内容 hash
+-- 保留策略: `flask --app app compact-config-revisions --keep 50 --daily-days 30`
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS `portfolio_config_blobs` (
+  `blob_hash` CHAR(64) NOT NULL COMMENT '内容 sha256',
+  `content` LONGTEXT NOT NULL COMMENT '字段内容',
+  `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`blob_hash`),
+  KEY `idx_config_blobs_created` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='配置字段内容存储';
+
+CREATE TABLE IF NOT EXISTS `portfolio_config_revisions` (
+  `revision_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `account_id` INT UNSIGNED NOT NULL COMMENT '关联账号 ID',
+  `revision` BIGINT NOT NULL COMMENT '版本号',
+  `stock_codes_hash` CHAR(64) NOT NULL,
+  `memos_hash` CHAR(64) NOT NULL,
+  `holdings_hash` CHAR(64) NOT NULL,
+  `alert_prices_hash` CHAR(64) NOT NULL,
+  `index_codes_hash` CHAR(64) NOT NULL,
+  `pinned_stocks_hash` CHAR(64) NOT NULL,
+  `data_hash` VARCHAR(64) DEFAULT NULL COMMENT '整份配置 Hash',
+  `last_client` VARCHAR(50) DEFAULT NULL COMMENT '写入客户端',
+  `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`revision_id`),
+  UNIQUE KEY `uk_config_revisions_account_revision` (`account_id`, `revision`),
+  KEY `idx_config_revisions_account_time` (`account_id`, `created_at`),
+  CONSTRAINT `fk_config_revisions_account`
+    FOREIGN KEY (`account_id`) REFERENCES `accounts`(`account_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='配置历史版本';
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- 2026-10-18 新增设备按天统计表（/stats/devices 数据源）
+-- add_user 时增量维护：设备当天首次使用计入 active_devices，首次注册计入 new_devices
+-- /stats/errors 与 /stats/sync 使用 2026-10-18_partition_log_tables.sql 中的 log_daily_rollups
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS `device_daily_stats` (
+  `day` DATE NOT NULL COMMENT '日期（与 users.last_use_date 同一时区）',
+  `app_type` VARCHAR(50) NOT NULL COMMENT '客户端类型',
+  `active_devices` INT UNSIGNED NOT NULL DEFAULT 0 COMMENT '当天活跃设备数',
+  `new_devices` INT UNSIGNED NOT NULL DEFAULT 0 COMMENT '当天新增设备数',
+  PRIMARY KEY (`day`, `app_type`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='设备按天统计';
+
+-- 回填新增设备数（历史活跃设备数无法从 users 精确还原，只回填最后使用日）
+INSERT INTO `device_daily_stats` (`day`, `app_type`, `active_devices`, `new_devices`)
+SELECT DATE(`register_date`), COALESCE(`app_type`, ''), 0, COUNT(*)
+FROM `users`
+GROUP BY DATE(`register_date`), COALESCE(`app_type`, '')
+ON DUPLICATE KEY UPDATE `new_devices` = VALUES(`new_devices`);
+
+INSERT INTO `device_daily_stats` (`day`, `app_type`, `active_devices`, `new_devices`)
+SELECT DATE(`last_use_date`), COALESCE(`app_type`, ''), COUNT(*), 0
+FROM `users`
+WHERE `last_use_date` IS NOT NULL
+GROUP BY DATE(`last_use_date`), COALESCE(`app_type`, '')
+ON DUPLICATE KEY UPDATE `active_devices` = VALUES(`active_devices`);
+
+COMMIT;
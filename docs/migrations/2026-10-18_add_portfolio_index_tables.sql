@@ -0,0 +1,36 @@
+-- 2026-10-18 新增组合结构化索引表（portfolio_positions / portfolio_alerts）
+-- 由 portfolio_configs 派生，原字段仍是同步数据源；启用 PORTFOLIO_INDEX_ENABLED 后在保存配置时维护
+-- 已有数据可执行 `flask --app app rebuild-portfolio-index` 回填
+
+START TRANSACTION;
+
+CREATE TABLE IF NOT EXISTS `portfolio_positions` (
+  `position_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `account_id` INT UNSIGNED NOT NULL COMMENT '关联账号 ID',
+  `stock_code` VARCHAR(32) NOT NULL COMMENT '股票代码',
+  `sort_order` INT DEFAULT NULL COMMENT '在 stock_codes 中的位置，仅置顶未自选时为 NULL',
+  `pinned` TINYINT(1) NOT NULL DEFAULT 0 COMMENT '是否置顶',
+  `shares` DOUBLE DEFAULT NULL COMMENT '持仓数量',
+  `cost_price` DOUBLE DEFAULT NULL COMMENT '持仓成本价',
+  PRIMARY KEY (`position_id`),
+  KEY `idx_positions_stock_account` (`stock_code`, `account_id`),
+  KEY `idx_positions_account` (`account_id`),
+  CONSTRAINT `fk_portfolio_positions_account`
+    FOREIGN KEY (`account_id`) REFERENCES `accounts`(`account_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='组合股票结构化索引';
+
+CREATE TABLE IF NOT EXISTS `portfolio_alerts` (
+  `alert_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  `account_id` INT UNSIGNED NOT NULL COMMENT '关联账号 ID',
+  `stock_code` VARCHAR(32) NOT NULL COMMENT '股票代码',
+  `alert_price` DOUBLE NOT NULL COMMENT '预警价',
+  PRIMARY KEY (`alert_id`),
+  KEY `idx_alerts_stock_price` (`stock_code`, `alert_price`),
+  KEY `idx_alerts_account` (`account_id`),
+  CONSTRAINT `fk_portfolio_alerts_account`
+    FOREIGN KEY (`account_id`) REFERENCES `accounts`(`account_id`)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='预警价结构化索引';
+
+COMMIT;
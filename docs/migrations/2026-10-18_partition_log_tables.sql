@@ -0,0 +1,92 @@
+-- 2026-10-18 日志表按月分区 + 按天汇总表
+-- user_actions / error_logs / config_audit_logs 改为 RANGE (TO_DAYS(时间列)) 月分区，过期数据整分区删除
+-- 看板统计改查 log_daily_rollups，不再扫描原始日志
+-- 日常维护:
+--   每天   `flask --app app rollup-logs`                    重算最近两天（不含当天）的汇总
+--   每月   `flask --app app prune-logs --keep-months 6`     预建未来分区、删除过期分区
+-- 注意:
+--   1. MySQL 分区表不支持外键，且分区列必须包含在主键中，因此需要先删除外键并把时间列加入主键
+--   2. ALTER TABLE ... PARTITION BY 会重建整表并隐式提交，请在低峰期逐条执行，无法放在事务中回滚
+--   3. 若 config_audit_logs 由 db.create_all() 创建，外键名称不同，请先 SHOW CREATE TABLE 确认后删除
+
+CREATE TABLE IF NOT EXISTS `log_daily_rollups` (
+  `day` DATE NOT NULL COMMENT '日期（UTC）',
+  `source` VARCHAR(16) NOT NULL COMMENT '来源: action / error / audit',
+  `category` VARCHAR(191) NOT NULL COMMENT 'action_type / error_type / 审计 action',
+  `app_version` VARCHAR(50) NOT NULL DEFAULT '' COMMENT '应用版本，审计日志为空',
+  `count` INT UNSIGNED NOT NULL DEFAULT 0 COMMENT '条数',
+  PRIMARY KEY (`day`, `source`, `category`, `app_version`),
+  KEY `idx_log_rollups_source_day` (`source`, `day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='日志按天汇总';
+
+-- 1. user_actions
+ALTER TABLE `user_actions` DROP FOREIGN KEY `fk_user_actions_user`;
+ALTER TABLE `user_actions`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`action_id`, `action_time`),
+  ADD KEY `idx_user_actions_time` (`action_time`);
+ALTER TABLE `user_actions`
+  PARTITION BY RANGE (TO_DAYS(`action_time`)) (
+    PARTITION p_history VALUES LESS THAN (TO_DAYS('2026-05-01')),
+    PARTITION p202605 VALUES LESS THAN (TO_DAYS('2026-06-01')),
+    PARTITION p202606 VALUES LESS THAN (TO_DAYS('2026-07-01')),
+    PARTITION p202607 VALUES LESS THAN (TO_DAYS('2026-08-01')),
+    PARTITION p202608 VALUES LESS THAN (TO_DAYS('2026-09-01')),
+    PARTITION p202609 VALUES LESS THAN (TO_DAYS('2026-10-01')),
+    PARTITION p202610 VALUES LESS THAN (TO_DAYS('2026-11-01')),
+    PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01')),
+    PARTITION p202612 VALUES LESS THAN (TO_DAYS('2027-01-01')),
+    PARTITION p202701 VALUES LESS THAN (TO_DAYS('2027-02-01')),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+  );
+
+-- 2. error_logs
+ALTER TABLE `error_logs` DROP FOREIGN KEY `fk_error_logs_user`;
+ALTER TABLE `error_logs`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`log_id`, `error_time`),
+  ADD KEY `idx_error_logs_time` (`error_time`);
+ALTER TABLE `error_logs`
+  PARTITION BY RANGE (TO_DAYS(`error_time`)) (
+    PARTITION p_history VALUES LESS THAN (TO_DAYS('2026-05-01')),
+    PARTITION p202605 VALUES LESS THAN (TO_DAYS('2026-06-01')),
+    PARTITION p202606 VALUES LESS THAN (TO_DAYS('2026-07-01')),
+    PARTITION p202607 VALUES LESS THAN (TO_DAYS('2026-08-01')),
+    PARTITION p202608 VALUES LESS THAN (TO_DAYS('2026-09-01')),
+    PARTITION p202609 VALUES LESS THAN (TO_DAYS('2026-10-01')),
+    PARTITION p202610 VALUES LESS THAN (TO_DAYS('2026-11-01')),
+    PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01')),
+    PARTITION p202612 VALUES LESS THAN (TO_DAYS('2027-01-01')),
+    PARTITION p202701 VALUES LESS THAN (TO_DAYS('2027-02-01')),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+  );
+
+-- 3. config_audit_logs（created_at 需改为 NOT NULL 才能进入主键）
+ALTER TABLE `config_audit_logs`
+  MODIFY `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`log_id`, `created_at`);
+ALTER TABLE `config_audit_logs`
+  PARTITION BY RANGE (TO_DAYS(`created_at`)) (
+    PARTITION p_history VALUES LESS THAN (TO_DAYS('2026-05-01')),
+    PARTITION p202605 VALUES LESS THAN (TO_DAYS('2026-06-01')),
+    PARTITION p202606 VALUES LESS THAN (TO_DAYS('2026-07-01')),
+    PARTITION p202607 VALUES LESS THAN (TO_DAYS('2026-08-01')),
+    PARTITION p202608 VALUES LESS THAN (TO_DAYS('2026-09-01')),
+    PARTITION p202609 VALUES LESS THAN (TO_DAYS('2026-10-01')),
+    PARTITION p202610 VALUES LESS THAN (TO_DAYS('2026-11-01')),
+    PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01')),
+    PARTITION p202612 VALUES LESS THAN (TO_DAYS('2027-01-01')),
+    PARTITION p202701 VALUES LESS THAN (TO_DAYS('2027-02-01')),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+  );
+
+-- 4. 回填历史汇总（分区前的数据也会被汇总，之后即可按保留策略删除）
+-- flask --app app rollup-logs --since 2025-01-01
+
+-- 汇总查询示例（替代 migration_20250207_add_audit_logs.sql 中的全表扫描）
+-- SELECT day, category AS action, SUM(count) AS count
+-- FROM log_daily_rollups
+-- WHERE source = 'audit' AND day >= CURDATE() - INTERVAL 30 DAY
+-- GROUP BY day, category
+-- ORDER BY day DESC;
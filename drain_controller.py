@@ -0,0 +1,53 @@
+"""
+平滑重启排空控制
+
+worker 收到停止信号（gunicorn 平滑重启 / 停止时的 SIGTERM）后进入排空状态:
+- 新的写请求直接返回 503 + retry_after，由客户端重试到新 worker
+- 已开始的写请求（可能持有账户锁与数据库事务）继续执行，退出前等待它们结束（有截止时间）
+
+计数只在进程内有效，每个 worker 独立排空。
+"""
+
+import threading
+from typing import Optional
+
+
+class DrainController:
+    """进行中写请求计数 + 排空状态（线程安全）"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._draining = False
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_enter(self) -> bool:
+        """开始一个写请求；已在排空时返回 False（调用方应拒绝该请求）"""
+        with self._cond:
+            if self._draining:
+                return False
+            self._in_flight += 1
+            return True
+
+    def leave(self):
+        with self._cond:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._cond.notify_all()
+
+    def start(self):
+        """进入排空状态（可重复调用）"""
+        with self._cond:
+            self._draining = True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待进行中的写请求全部结束，超时返回 False"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._in_flight == 0, timeout)
@@ -5,6 +5,7 @@ chdir = '/www/AhFunStokAPI'
 workers = 4
 
 # 指定每个进程开启的线程数
+# SQLite 单机部署时写操作由进程内单写线程串行执行，建议 workers = 1 并调大 threads
 threads = 2
 
 #启动用户
@@ -13,6 +14,13 @@ user = 'www'
 # 启动模式
 worker_class = 'sync'
 
+# 在 master 中导入应用与模型一次，fork 出的 worker 写时复制共享，新 worker 启动后可立即处理请求
+# 注意：预加载后 HUP 不会重新加载代码，发布新代码需用 USR2 + QUIT 平滑替换 master
+preload_app = True
+
+# 平滑重启 / 停止时等待 worker 处理完进行中请求的秒数，超时后强制结束（须大于应用配置 DRAIN_TIMEOUT）
+graceful_timeout = 30
+
 # 绑定的ip与端口
 bind = '0.0.0.0:50000' 
 
@@ -34,4 +42,56 @@ loglevel = 'info'
 # 自定义设置项请写到该处
 # 最好以上面相同的格式 <注释 + 换行 + key = value> 进行书写， 
 # PS: gunicorn 的配置文件是python扩展形式，即".py"文件，需要注意遵从python语法，
-# 如：loglevel的等级是字符串作为配置的，需要用引号包裹起来
\ No newline at end of file
+# 如：loglevel的等级是字符串作为配置的，需要用引号包裹起来
+
+
+def when_ready(server):
+    """master 就绪、fork worker 之前：导入延迟加载的模块，并冻结 GC 跟踪的对象，减少 fork 后的写时复制"""
+    import gc
+    import app
+    app.warm_up()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """worker fork 之后：丢弃从 master 继承的数据库连接池，每个 worker 建立自己的连接；后台加载账号占用预判"""
+    import app
+    app.reset_after_fork()
+
+
+def post_worker_init(worker):
+    """
+    worker 收到 SIGTERM（HUP 平滑重启 / 停止）时先进入排空状态，新的写请求返回 503。
+    gthread worker 同时不再接受新连接（由新 worker 接受），之后的响应都带 Connection: close，
+    客户端改连新 worker；排空窗口（keepalive 秒数 + 1 秒轮询间隔）结束后再交给 gunicorn 停止，
+    此时空闲长连接已超时关闭，不会出现请求发到即将关闭的长连接上被直接断开。
+    """
+    import signal
+    import threading
+    from gunicorn.workers.gthread import ThreadWorker
+    import app
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def drain_then_exit(signum, frame):
+        if app.drain_controller.draining:
+            return
+        app.begin_drain()
+        if isinstance(worker, ThreadWorker):
+            for sock in worker.sockets:
+                worker.poller.unregister(sock)
+            # 长连接数上限置 0：之后的请求一律 force_close（cfg.keepalive 不变，已在等待的长连接按原超时关闭）
+            worker.max_keepalived = 0
+        threading.Timer(worker.cfg.keepalive + 1, handle_exit, (signum, frame)).start()
+
+    signal.signal(signal.SIGTERM, drain_then_exit)
+
+
+def worker_exit(server, worker):
+    """worker 退出前：等待进行中的写请求结束，并写出审计计数与流量录制缓冲"""
+    import signal
+    import app
+    # master 会对多余的旧 worker 重复发送 SIGTERM，退出阶段忽略，避免解释器清理时恢复默认处理被信号杀死
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if not app.finish_drain():
+        server.log.warning("Worker %s exited before in-flight writes drained", worker.pid)
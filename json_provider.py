@@ -0,0 +1,62 @@
+"""
+Flask JSON provider：安装了 orjson 时用其 C 实现编解码，未安装时与 Flask 默认实现完全一致
+
+与 DefaultJSONProvider 的输出差异只有:
+- 非 ASCII 字符直接输出 UTF-8（不转义为 \\uXXXX），memos 等中文内容的响应体更小
+- 缩进 / 紧凑格式、键排序、datetime / date / Decimal / UUID / dataclass 的编码与默认实现相同
+  （datetime 与 dataclass 交给 Flask 的 default 处理，不用 orjson 内置的格式）
+orjson 不支持的值（超过 64 位的整数、非字符串且不可排序的键等）自动退回标准库 json。
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider 的 orjson 加速版本（app.json = FastJSONProvider(app)）"""
+
+    @property
+    def accelerated(self) -> bool:
+        return orjson is not None
+
+    def dump_bytes(self, obj, indent: bool = False) -> bytes:
+        """编码为 UTF-8 字节（与 dumps 相同的格式，紧凑或两空格缩进）"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+        if indent:
+            return super().dumps(obj, indent=2).encode('utf-8')
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        # 带额外参数（indent、cls 等）的调用保持标准库行为
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dump_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN / 超大整数等标准库可以解析的输入；真正的格式错误由标准库抛出同样的 ValueError
+            return super().loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dump_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,104 @@
+"""
+组合配置字段解析
+
+portfolio_configs 中的字段以分隔字符串存储（与客户端格式保持一致）:
+- stock_codes / index_codes / pinned_stocks: 逗号分隔的代码列表
+- holdings: 逗号分隔，与 stock_codes 按位置对应，格式 `数量*成本价`，空项表示无持仓
+- alert_prices: 逗号分隔，与 stock_codes 按位置对应，同一股票多个预警价用 `/` 分隔
+- memos: 管道符分隔，与 stock_codes 按位置对应
+
+本模块只做纯字符串解析，不依赖 Flask / 数据库。
+"""
+
+from collections import namedtuple
+from typing import Optional, Tuple
+
+Holding = namedtuple('Holding', ['stock_code', 'shares', 'cost_price'])
+Alert = namedtuple('Alert', ['stock_code', 'price'])
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    # 过滤 nan / inf
+    if number != number or number in (float('inf'), float('-inf')):
+        return None
+    return number
+
+
+def split_codes(value: Optional[str]) -> Tuple[str, ...]:
+    """拆分代码列表，去除空项并保持顺序去重"""
+    if not value:
+        return ()
+    seen = set()
+    codes = []
+    for code in value.split(','):
+        code = code.strip()
+        if code and code not in seen:
+            seen.add(code)
+            codes.append(code)
+    return tuple(codes)
+
+
+def split_positional(value: Optional[str], separator: str = ',') -> Tuple[str, ...]:
+    """按位置拆分（保留空项，用于与 stock_codes 对齐）"""
+    if not value:
+        return ()
+    return tuple(item.strip() for item in value.split(separator))
+
+
+def parse_holding_entry(entry: str) -> Optional[Tuple[float, float]]:
+    """解析单条持仓 `数量*成本价`，无效返回 None"""
+    if not entry or '*' not in entry:
+        return None
+    shares_text, _, cost_text = entry.partition('*')
+    shares = _to_float(shares_text)
+    cost_price = _to_float(cost_text)
+    if shares is None or cost_price is None:
+        return None
+    return shares, cost_price
+
+
+def parse_alert_entry(entry: str) -> Tuple[float, ...]:
+    """解析单只股票的预警价 `p1/p2/...`，忽略无效或非正数值"""
+    if not entry:
+        return ()
+    prices = []
+    for item in entry.split('/'):
+        price = _to_float(item.strip())
+        if price is not None and price > 0:
+            prices.append(price)
+    return tuple(prices)
+
+
+def parse_holdings(stock_codes: Optional[str], holdings: Optional[str]) -> Tuple[Holding, ...]:
+    """解析持仓，返回 Holding 元组（跳过空项与无效项）"""
+    codes = split_positional(stock_codes)
+    entries = split_positional(holdings)
+    result = []
+    seen = set()
+    for code, entry in zip(codes, entries):
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        parsed = parse_holding_entry(entry)
+        if parsed is not None:
+            result.append(Holding(code, parsed[0], parsed[1]))
+    return tuple(result)
+
+
+def parse_alert_prices(stock_codes: Optional[str], alert_prices: Optional[str]) -> Tuple[Alert, ...]:
+    """解析预警价，返回 Alert 元组（同一股票多个预警价展开为多条）"""
+    codes = split_positional(stock_codes)
+    entries = split_positional(alert_prices)
+    result = []
+    seen = set()
+    for code, entry in zip(codes, entries):
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        for price in parse_alert_entry(entry):
+            result.append(Alert(code, price))
+    return tuple(result)
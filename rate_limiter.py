@@ -0,0 +1,142 @@
+"""
+跨进程共享的令牌桶限流表
+
+令牌桶存放在文件映射的共享内存（默认 /dev/shm）中，gunicorn 的多个 worker 打开同一文件即共享同一张表，
+进程间用 fcntl.flock 互斥，进程内线程用 threading.Lock 互斥。
+
+表为定长开放寻址哈希表，每个槽位 24 字节: key_hash(u64) / tokens(f64) / updated(f64)。
+探测范围内没有空槽时淘汰最久未更新的桶（长时间空闲的桶本来就是满的，淘汰后重新从满桶开始，不影响正确性）。
+未安装 fcntl（Windows）时退化为进程内匿名内存。
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SLOT = struct.Struct('<Qdd')
+PROBE_LENGTH = 8
+
+
+def _key_hash(key: str) -> int:
+    # 0 表示空槽，最低位置 1 保证 hash 非 0
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') | 1
+
+
+class TokenBucketTable:
+    """令牌桶表；首次使用时（fork 之后）在当前进程打开共享内存"""
+
+    def __init__(self, path: str, slots: int = 65536):
+        self.path = path
+        self.slots = slots
+        self._size = slots * SLOT.size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        if self._map is not None and self._pid == os.getpid():
+            return
+        # fork 继承的文件描述符与父进程共享 flock，必须在每个进程重新打开
+        if fcntl is None:
+            self._fd = None
+            self._map = mmap.mmap(-1, self._size)
+        else:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < self._size:
+                    os.ftruncate(fd, self._size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._fd = fd
+            self._map = mmap.mmap(fd, self._size)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            self._open()
+            if self._fd is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, key_hash: int, claimed=()):
+        """返回 (槽位偏移, 是否命中)；claimed 为本次调用已占用的槽位，不作为空槽或淘汰候选"""
+        start = key_hash % self.slots
+        empty = stalest = None
+        stalest_updated = float('inf')
+        for step in range(PROBE_LENGTH):
+            offset = (start + step) % self.slots * SLOT.size
+            stored_hash, _, updated = SLOT.unpack_from(self._map, offset)
+            if stored_hash == key_hash:
+                return offset, True
+            if offset in claimed:
+                continue
+            if stored_hash == 0:
+                if empty is None:
+                    empty = offset
+            elif updated < stalest_updated:
+                stalest, stalest_updated = offset, updated
+        return (empty if empty is not None else stalest), False
+
+    def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        从 key 对应的桶取 cost 个令牌（每秒补充 rate 个，最多 burst 个）
+
+        成功返回 0；令牌不足时不扣减，返回需要等待的秒数。
+        """
+        return self.consume_all([(key, rate, burst)], cost)
+
+    def consume_all(self, buckets, cost: float = 1.0) -> float:
+        """
+        buckets: [(key, rate, burst), ...]，所有桶都有 cost 个令牌时才同时扣减
+
+        成功返回 0；任一桶不足时都不扣减，返回需要等待的最长秒数。
+        """
+        with self._locked():
+            now = time.time()
+            states = []
+            claimed = set()
+            retry_after = 0.0
+            for key, rate, burst in buckets:
+                key_hash = _key_hash(key)
+                offset, found = self._find_slot(key_hash, claimed)
+                if offset is None:
+                    # 探测范围内的槽位都已被本次调用的其他桶占用（slots 过小），该桶不限流
+                    continue
+                claimed.add(offset)
+                if found:
+                    _, tokens, updated = SLOT.unpack_from(self._map, offset)
+                    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+                else:
+                    # 新桶先写入占用槽位，后面的桶不会再选中或淘汰它
+                    tokens = burst
+                    SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+                if tokens < cost:
+                    retry_after = max(retry_after, (cost - tokens) / rate if rate > 0 else float('inf'))
+                states.append((offset, key_hash, tokens))
+
+            spent = 0.0 if retry_after else cost
+            for offset, key_hash, tokens in states:
+                SLOT.pack_into(self._map, offset, key_hash, tokens - spent, now)
+            return retry_after
+
+    def reset(self):
+        """清空所有桶（测试与运维用）"""
+        with self._locked():
+            self._map[:] = bytes(self._size)
@@ -0,0 +1,66 @@
+"""
+同步接口已编码响应体的进程内缓存
+
+GET /sync/config 的响应只由 (account_id, revision, data_hash) 决定。按协商的格式（JSON / MessagePack）
+与压缩方式分别缓存编码、压缩后的字节，同一版本被多台设备反复拉取时不再加载配置内容、序列化与压缩。
+revision / data_hash 每次请求都从数据库读取，配置更新后自然换用新键，旧版本按 LRU 淘汰。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class EncodedResponseCache:
+    """键 → (响应体, mimetype, Content-Encoding) 的 LRU 缓存，按响应体字节数淘汰（线程安全；max_bytes 为 0 时不缓存）"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes, mimetype: str, content_encoding: Optional[str] = None):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous[0])
+            self._entries[key] = (body, mimetype, content_encoding)
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
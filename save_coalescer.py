@@ -0,0 +1,90 @@
+"""
+配置保存合并（coalescing）
+
+同一设备（登录 token）基于同一 revision 连续提交的整份配置，排在账户锁后面时只执行最后一个:
+- 轮到执行时已有更新的请求排队 → 直接返回 superseded，不占用数据库
+- 同一批次中前一个请求已写入时，最后一个请求视为在其结果之上快进，而不是当作冲突
+
+计数只在进程内有效（与 get_account_lock 相同），不同 worker 间不合并。
+"""
+
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ('latest', 'pending', 'applied_revision')
+
+    def __init__(self):
+        self.latest = 0
+        self.pending = 0
+        self.applied_revision = None
+
+
+class SaveSlot:
+    """单个保存请求在合并队列中的位置"""
+    __slots__ = ('_coalescer', '_key', '_ticket')
+
+    def __init__(self, coalescer: 'SaveCoalescer', key: Optional[Hashable], ticket: int):
+        self._coalescer = coalescer
+        self._key = key
+        self._ticket = ticket
+
+    @property
+    def superseded(self) -> bool:
+        """是否已有同设备、同 base revision 的更新请求在排队"""
+        if self._key is None:
+            return False
+        with self._coalescer._lock:
+            return self._coalescer._entries[self._key].latest != self._ticket
+
+    @property
+    def applied_revision(self) -> Optional[int]:
+        """同一批次中前一个请求写入后的 revision"""
+        if self._key is None:
+            return None
+        with self._coalescer._lock:
+            return self._coalescer._entries[self._key].applied_revision
+
+    def record_applied(self, revision: int):
+        if self._key is None:
+            return
+        with self._coalescer._lock:
+            self._coalescer._entries[self._key].applied_revision = revision
+
+
+class SaveCoalescer:
+    """按 (account_id, 设备, base revision) 合并排队的保存请求（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._tickets = itertools.count(1)
+
+    @contextmanager
+    def slot(self, key: Optional[Hashable]):
+        """在获取账户锁之前进入；key 为 None 时不参与合并"""
+        if key is None:
+            yield SaveSlot(self, None, 0)
+            return
+
+        with self._lock:
+            ticket = next(self._tickets)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.latest = ticket
+            entry.pending += 1
+        slot = SaveSlot(self, key, ticket)
+        try:
+            yield slot
+        finally:
+            with self._lock:
+                entry.pending -= 1
+                if entry.pending == 0:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
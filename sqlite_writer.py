@@ -0,0 +1,114 @@
+"""
+SQLite 单机部署支持
+
+- 连接建立时设置 PRAGMA（WAL、synchronous、cache_size、mmap_size、busy_timeout 等）
+- 单写线程: 所有写操作经队列交给同一个线程串行执行，读请求仍在各自的请求线程并发执行。
+  写线程上的事务以 BEGIN IMMEDIATE 开始，一开始就持有写锁，等价于 MySQL 的 SELECT ... FOR UPDATE
+  （SQLite 不支持 FOR UPDATE，SQLAlchemy 会直接忽略），多个进程共用同一库文件时也不会出现
+  读事务升级为写事务时的 "database is locked"。
+
+写任务在调用方的 contextvars 上下文中执行，Flask 的 request / g 与 Flask-SQLAlchemy 的 session
+与请求线程是同一份；调用方在等待结果期间不会使用 session，不存在并发访问。
+"""
+
+import contextvars
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from sqlalchemy import event
+
+
+class WriterBusy(Exception):
+    """写队列已满，或排队超过等待时间仍未开始执行"""
+
+
+class SqliteWriter:
+    """单写线程（首次使用时在当前进程启动，fork 之后在子进程重新启动）"""
+
+    def __init__(self, queue_size: int = 256, timeout: float = 10.0):
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+        self._thread_ident = None
+
+    def in_writer(self) -> bool:
+        return self._pid == os.getpid() and threading.get_ident() == self._thread_ident
+
+    def call(self, func, *args, **kwargs):
+        """在写线程执行 func 并等待返回值（func 抛出的异常原样抛出）"""
+        self._ensure_thread()
+        future = Future()
+        try:
+            self._queue.put_nowait((future, contextvars.copy_context(), func, args, kwargs))
+        except queue.Full:
+            self.rejected += 1
+            raise WriterBusy('write queue is full')
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # 尚未开始执行的任务直接取消；已在执行的任务必须等它结束
+            if future.cancel():
+                self.rejected += 1
+                raise WriterBusy('write queue wait timed out')
+            return future.result()
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            started = threading.Event()
+            threading.Thread(target=self._run, args=(started,), name='sqlite-writer', daemon=True).start()
+            started.wait()
+            self._pid = os.getpid()
+
+    def _run(self, started: threading.Event):
+        self._thread_ident = threading.get_ident()
+        started.set()
+        while True:
+            future, context, func, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(func, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            self.completed += 1
+
+
+def configure_sqlite_engine(engine, pragmas: dict, writer: Optional[SqliteWriter] = None):
+    """为 SQLite engine 注册连接 / 事务事件（须在第一次建立连接之前调用）"""
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        if writer is not None:
+            # 关闭 pysqlite 的隐式事务，由 begin 事件自行发出 BEGIN / BEGIN IMMEDIATE
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    if writer is not None:
+        @event.listens_for(engine, 'begin')
+        def _on_begin(conn):
+            conn.exec_driver_sql('BEGIN IMMEDIATE' if writer.in_writer() else 'BEGIN')
@@ -0,0 +1,210 @@
+"""
+存储后端
+
+模型与接口代码只有一份，MySQL / SQLite 的方言差异集中在这里:
+- 计数 UPSERT（ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE）与忽略主键冲突的 INSERT
+- 行锁（MySQL SELECT ... FOR UPDATE；SQLite 不支持，由单写线程的 BEGIN IMMEDIATE 保证串行）
+- 行锁等待超时（MySQL 按事务设置 innodb_lock_wait_timeout；SQLite 由 busy_timeout PRAGMA 决定）
+- 唯一键冲突识别（IntegrityError 中的键名 / 列名）
+- 连接初始化（SQLite PRAGMA 与单写线程）
+- 批量导入期间关闭约束检查
+- 日志表按月分区（仅 MySQL）
+
+由 STORAGE_BACKEND 配置选择，'auto' 时按连接串的方言选择。
+"""
+
+import math
+import re
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from sqlite_writer import SqliteWriter, configure_sqlite_engine
+
+
+class StorageBackend:
+    """方言相关操作的接口（默认实现为标准 SQL）"""
+
+    name = 'generic'
+    # 是否支持日志表分区维护（prune-logs 按分区删除）
+    supports_partitions = False
+
+    def __init__(self, engine, config: dict):
+        self.engine = engine
+        # 单写线程（仅 SQLite 文件库）
+        self.writer: Optional[SqliteWriter] = None
+
+    def lock_for_update(self, query):
+        """读取并锁定行，直到事务结束"""
+        return query.with_for_update()
+
+    @contextmanager
+    def lock_wait_timeout(self, session, seconds: Optional[float]):
+        """在 session 的当前事务内限制行锁等待秒数（默认实现不做处理）"""
+        yield
+
+    def unique_violation(self, error, table) -> Optional[tuple]:
+        """IntegrityError 是 table 上的唯一键冲突时返回冲突的列名，否则返回 None"""
+        return None
+
+    def insert_ignore(self, table):
+        """主键冲突时忽略的 INSERT（并发写入相同内容寻址数据时使用）"""
+        raise NotImplementedError
+
+    def increment_counters(self, executor, table, rows: list, counter_columns: tuple):
+        """批量累加计数，主键已存在时在原值上相加；executor 为 Session 或 Connection"""
+        raise NotImplementedError
+
+    def set_constraint_checks(self, conn, enabled: bool):
+        """导入期间关闭 / 恢复外键与唯一性检查"""
+        conn.commit()
+
+    def stats(self) -> dict:
+        return {'backend': self.name}
+
+
+class MySQLBackend(StorageBackend):
+    name = 'mysql'
+    supports_partitions = True
+
+    # ER_DUP_ENTRY: Duplicate entry '...' for key 'uk_accounts_username'（8.0.19 起键名带表名前缀）
+    _DUPLICATE_KEY = re.compile(r"for key '(?:[^'.]+\.)?([^'.]+)'")
+
+    # 连接 info 中的标记：会话的 innodb_lock_wait_timeout 已修改、尚未恢复
+    _LOCK_WAIT_MODIFIED = 'lock_wait_timeout_modified'
+
+    def __init__(self, engine, config: dict):
+        super().__init__(engine, config)
+        event.listen(engine, 'checkin', self._restore_lock_wait_timeout)
+
+    @classmethod
+    def _restore_lock_wait_timeout(cls, dbapi_connection, connection_record):
+        """连接归还连接池时恢复未能在事务内恢复的 innodb_lock_wait_timeout"""
+        if not connection_record.info.pop(cls._LOCK_WAIT_MODIFIED, False) or dbapi_connection is None:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('SET SESSION innodb_lock_wait_timeout = DEFAULT')
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def lock_wait_timeout(self, session, seconds: Optional[float]):
+        if not seconds:
+            yield
+            return
+        # 会话变量在连接归还连接池后仍然有效，必须恢复为全局默认值
+        connection = session.connection()
+        connection.info[self._LOCK_WAIT_MODIFIED] = True
+        # innodb_lock_wait_timeout 为整数秒，最小 1
+        session.execute(text('SET SESSION innodb_lock_wait_timeout = :seconds'),
+                        {'seconds': max(1, math.ceil(seconds))})
+        try:
+            yield
+        finally:
+            try:
+                session.execute(text('SET SESSION innodb_lock_wait_timeout = DEFAULT'))
+                connection.info.pop(self._LOCK_WAIT_MODIFIED, None)
+            except SQLAlchemyError:
+                # 事务已失效（出错待回滚）时无法执行，由归还连接池时的 checkin 事件恢复
+                pass
+
+    def unique_violation(self, error, table) -> Optional[tuple]:
+        args = getattr(error.orig, 'args', ())
+        if len(args) < 2 or args[0] != 1062:
+            return None
+        match = self._DUPLICATE_KEY.search(str(args[1]))
+        if not match:
+            return None
+        key = match.group(1)
+        for constraint in list(table.constraints) + list(table.indexes):
+            if constraint.name == key:
+                return tuple(column.name for column in constraint.columns)
+        # create_all 建表时未命名的唯一键以第一列命名
+        return (key,) if key in table.c else None
+
+    def insert_ignore(self, table):
+        return table.insert().prefix_with('IGNORE')
+
+    def increment_counters(self, executor, table, rows: list, counter_columns: tuple):
+        statement = mysql_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in counter_columns}
+        )
+        executor.execute(statement)
+
+    def set_constraint_checks(self, conn, enabled: bool):
+        value = 1 if enabled else 0
+        conn.exec_driver_sql(f"SET SESSION foreign_key_checks = {value}, unique_checks = {value}")
+        conn.commit()
+
+
+class SQLiteBackend(StorageBackend):
+    name = 'sqlite'
+
+    # UNIQUE constraint failed: accounts.username[, accounts.xxx]
+    _UNIQUE_FAILED = re.compile(r'UNIQUE constraint failed: (.+)')
+
+    def __init__(self, engine, config: dict):
+        super().__init__(engine, config)
+        # 内存库所有线程共用一个连接，不启用单写线程
+        if config['SQLITE_SINGLE_WRITER'] and engine.url.database not in (None, '', ':memory:'):
+            self.writer = SqliteWriter(config['SQLITE_WRITE_QUEUE_SIZE'], config['SQLITE_WRITE_TIMEOUT'])
+        configure_sqlite_engine(engine, config['SQLITE_PRAGMAS'], self.writer)
+
+    def lock_for_update(self, query):
+        # SQLite 会忽略 FOR UPDATE；写操作在单写线程以 BEGIN IMMEDIATE 开始，事务开始即持有写锁
+        return query
+
+    def unique_violation(self, error, table) -> Optional[tuple]:
+        match = self._UNIQUE_FAILED.search(str(error.orig))
+        if not match:
+            return None
+        columns = [item.strip() for item in match.group(1).split(',')]
+        if not all(column.startswith(f'{table.name}.') for column in columns):
+            return None
+        return tuple(column[len(table.name) + 1:] for column in columns)
+
+    def insert_ignore(self, table):
+        return table.insert().prefix_with('OR IGNORE')
+
+    def increment_counters(self, executor, table, rows: list, counter_columns: tuple):
+        key_columns = [column.name for column in table.primary_key.columns]
+        statement = sqlite_insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: table.c[name] + statement.excluded[name] for name in counter_columns},
+        )
+        executor.execute(statement)
+
+    def set_constraint_checks(self, conn, enabled: bool):
+        conn.exec_driver_sql(f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'}")
+        conn.commit()
+
+    def stats(self) -> dict:
+        body = super().stats()
+        if self.writer is not None:
+            body['writer'] = self.writer.stats()
+        return body
+
+
+STORAGE_BACKENDS = {
+    'mysql': MySQLBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def create_storage_backend(engine, config: dict) -> StorageBackend:
+    """按 STORAGE_BACKEND 配置创建后端（须在 engine 第一次建立连接之前调用）"""
+    name = config.get('STORAGE_BACKEND') or 'auto'
+    if name == 'auto':
+        name = engine.dialect.name
+    try:
+        backend_class = STORAGE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported storage backend: {name}") from None
+    return backend_class(engine, config)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+账号标识占用预判测试
+    - BloomFilter：加入的标识一定判定为存在，误判率接近 error_rate
+    - AccountFilter：未加载时都判定为可能存在，标识按 strip + casefold 归一，rebuild / extend / 超容量重建
+    - /auth/available 与 /auth/register：预判在后台加载，加载前后结果都正确，加载后未占用的标识不查数据库
+
+    python test_account_filter.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from account_filter import AccountFilter, BloomFilter
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"  {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_bloom_filter() -> bool:
+    print("\n检查 Bloom filter...")
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add(f"user{i}")
+    ok = check("加入的标识全部判定为存在（无漏判）", all(f"user{i}" in bloom for i in range(10000)))
+    false_positives = sum(f"other{i}" in bloom for i in range(20000))
+    ok &= check(f"误判率 {false_positives / 20000:.4f}（error_rate 0.01）", false_positives / 20000 < 0.02)
+    ok &= check(f"计数 {bloom.count} 接近加入的不同标识数", 9800 <= bloom.count <= 10000)
+    return ok
+
+
+def test_account_filter() -> bool:
+    print("\n检查 AccountFilter...")
+    accounts = AccountFilter(capacity=100, error_rate=0.01, refresh_interval=60)
+    ok = check("未加载时需要加载、需要全量重建", accounts.needs_refresh() and accounts.needs_rebuild())
+    ok &= check("未加载时判定为可能存在", accounts.might_exist('username', 'alice'))
+
+    accounts.rebuild([(1, 'Alice', 'alice@example.com', None), (7, 'bob', None, '13800000000')])
+    ok &= check("加载后不需要刷新", not accounts.needs_refresh() and not accounts.needs_rebuild())
+    ok &= check("已占用的标识判定为可能存在（大小写、首尾空格不敏感）",
+                accounts.might_exist('username', ' alice ') and accounts.might_exist('email', 'ALICE@example.com')
+                and accounts.might_exist('mobile_phone', '13800000000'))
+    ok &= check("未占用的标识判定为不存在", not accounts.might_exist('username', 'carol'))
+    ok &= check("字段之间互不影响", not accounts.might_exist('email', 'bob'))
+    ok &= check(f"增量加载起点 {accounts.load_since()}（max_account_id 7 减去回看数，不小于 0）",
+                accounts.load_since() == 0)
+
+    accounts.extend([(8, 'carol', None, None)])
+    ok &= check("extend 后新账号判定为可能存在", accounts.might_exist('username', 'carol'))
+    ok &= check("extend 更新 max_account_id", accounts.max_account_id == 8)
+
+    accounts.extend((i, f"bulk{i}", None, None) for i in range(9, 200))
+    ok &= check("标识数超过容量后需要全量重建", accounts.needs_rebuild())
+
+    disabled = AccountFilter(capacity=0, error_rate=0.01, refresh_interval=60)
+    ok &= check("capacity 为 0 时不启用（不加载，全部查数据库）",
+                not disabled.enabled and not disabled.needs_refresh() and disabled.might_exist('username', 'x'))
+    return ok
+
+
+def test_routes(workdir: str) -> bool:
+    print("\n检查注册与可用性接口...")
+    import app as app_module
+
+    app = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'RATE_LIMIT_ENABLED': False,
+        'RATE_LIMIT_SHM_PATH': os.path.join(workdir, 'rate_limit'),
+    })
+    with app.app_context():
+        app_module.db.create_all()
+    client = app.test_client()
+    state = app.extensions['ahfunstock']
+
+    resp = client.post('/auth/register', json={'username': 'Alice', 'password': 'x', 'email': 'alice@example.com'})
+    ok = check("注册成功", resp.status_code == 201)
+    resp = client.post('/auth/register', json={'username': 'Alice', 'password': 'x'})
+    ok &= check("预判加载中重复的用户名 409（查数据库）", resp.status_code == 409)
+
+    deadline = time.time() + 10
+    while not state.account_filter.stats()['loaded'] and time.time() < deadline:
+        time.sleep(0.05)
+    ok &= check("预判在后台加载完成", state.account_filter.stats()['loaded'])
+
+    resp = client.get('/auth/available?username=Alice&email=bob@example.com')
+    ok &= check(f"已占用 / 未占用标识判断正确（{resp.get_json()}）",
+                resp.get_json() == {'username': False, 'email': True})
+    answered = state.account_filter.stats()['answered_without_db']
+    client.get('/auth/available?username=nobody_here')
+    ok &= check("加载后未占用的标识不查数据库", state.account_filter.stats()['answered_without_db'] == answered + 1)
+
+    resp = client.post('/auth/register', json={'username': 'bob', 'password': 'x', 'email': 'alice@example.com'})
+    ok &= check(f"邮箱冲突 409（{resp.get_json()}）", resp.status_code == 409
+                and resp.get_json()['message'] == 'Email already in use')
+    resp = client.post('/auth/register', json={'username': 'bob', 'password': 'x'})
+    ok &= check("注册后新账号立即加入预判", resp.status_code == 201
+                and client.get('/auth/available?username=bob').get_json() == {'username': False})
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("账号标识占用预判测试")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp(prefix='test_account_filter_')
+    results = [test_bloom_filter(), test_account_filter(), test_routes(workdir)]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 占用预判测试通过")
+        sys.exit(0)
+    print("❌ 占用预判测试失败")
+    sys.exit(1)
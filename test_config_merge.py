@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+配置三方合并测试（config_merge.merge_configs，纯函数，不需要数据库）
+    - 有序集合：双方的增删都保留
+    - 映射字段：不同股票的修改合并，同一股票改成不同值冲突
+    - 一方删除股票、另一方修改其持仓 / 预警 / 备注时冲突（不静默丢弃修改）
+    - 无法按位置映射时整字段比较
+
+    python test_config_merge.py
+"""
+
+import os
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config_merge import merge_configs, merge_ordered_set
+
+BASE = {
+    'stock_codes': 'sh600000,sz000001,sh600519',
+    'holdings': '100*10.5,,200*1500',
+    'alert_prices': '9.5/11,,',
+    'memos': '银行||白酒',
+    'pinned_stocks': 'sh600519',
+    'index_codes': 'sh000001',
+}
+
+
+def version(**changes) -> dict:
+    return dict(BASE, **changes)
+
+
+def check(label: str, condition: bool, detail=None) -> bool:
+    print(f"  {'✅' if condition else '❌'} {label}" + (f"  {detail}" if not condition and detail is not None else ''))
+    return condition
+
+
+def test_ordered_sets() -> bool:
+    print("\n检查有序集合合并...")
+    ok = check("双方各自新增都保留", merge_ordered_set('a,b', 'a,b,c', 'a,b,d') == 'a,b,d,c')
+    ok &= check("一方删除、另一方新增", merge_ordered_set('a,b,c', 'a,c', 'a,b,c,d') == 'a,c,d')
+    ok &= check("只有一方修改时直接采用", merge_ordered_set('a,b', 'b,a', 'a,b') == 'b,a')
+    return ok
+
+
+def test_keyed_fields() -> bool:
+    print("\n检查映射字段合并...")
+    merged, conflicts = merge_configs(
+        BASE,
+        version(holdings='300*10.5,,200*1500'),
+        version(memos='银行|平安|白酒'),
+    )
+    ok = check("不同字段的修改合并", not conflicts and merged['holdings'] == '300*10.5,,200*1500'
+               and merged['memos'] == '银行|平安|白酒', (merged, conflicts))
+
+    merged, conflicts = merge_configs(
+        BASE,
+        version(holdings='300*10.5,,200*1500'),
+        version(holdings='100*10.5,,100*1500'),
+    )
+    ok &= check("同一字段不同股票的修改合并", not conflicts and merged['holdings'] == '300*10.5,,100*1500',
+                (merged, conflicts))
+
+    _, conflicts = merge_configs(
+        BASE,
+        version(alert_prices='9/11,,'),
+        version(alert_prices='9.8/11,,'),
+    )
+    ok &= check("同一股票改成不同值时冲突", conflicts == [{'field': 'alert_prices', 'key': 'sh600000'}], conflicts)
+
+    merged, conflicts = merge_configs(
+        BASE,
+        version(stock_codes='sh600000,sz000001,sh600519,sz300750', holdings='100*10.5,,200*1500,50*180'),
+        version(stock_codes='sh601318,sh600000,sz000001,sh600519', holdings='10*45,100*10.5,,200*1500'),
+    )
+    ok &= check("双方各自新增股票及持仓都保留",
+                not conflicts and merged['stock_codes'] == 'sh601318,sh600000,sz000001,sh600519,sz300750'
+                and merged['holdings'] == '10*45,100*10.5,,200*1500,50*180', (merged, conflicts))
+    return ok
+
+
+def test_delete_vs_modify() -> bool:
+    print("\n检查删除与修改冲突...")
+    deleted = version(stock_codes='sz000001,sh600519', holdings=',200*1500', alert_prices=',', memos='|白酒')
+
+    _, conflicts = merge_configs(BASE, deleted, version(holdings='500*10.5,,200*1500'))
+    ok = check("客户端删除、服务端修改持仓时冲突",
+               conflicts == [{'field': 'holdings', 'key': 'sh600000', 'deleted': True}], conflicts)
+
+    _, conflicts = merge_configs(BASE, version(memos='加仓||白酒', alert_prices='9/12,,'), deleted)
+    ok &= check("服务端删除、客户端修改备注与预警时冲突",
+                sorted(item['field'] for item in conflicts) == ['alert_prices', 'memos']
+                and all(item['key'] == 'sh600000' and item.get('deleted') for item in conflicts), conflicts)
+
+    merged, conflicts = merge_configs(BASE, deleted, version(holdings='100*10.5,,300*1500'))
+    ok &= check("删除的股票未被另一方修改时合并",
+                not conflicts and merged['stock_codes'] == 'sz000001,sh600519'
+                and merged['holdings'] == ',300*1500', (merged, conflicts))
+
+    merged, conflicts = merge_configs(BASE, deleted, version(holdings=',,200*1500'))
+    ok &= check("另一方只是清空了被删除股票的值时合并", not conflicts, conflicts)
+    return ok
+
+
+def test_unmappable_fallback() -> bool:
+    print("\n检查无法按位置映射时整字段比较...")
+    ours = version(memos='a|b|c|d')
+    merged, conflicts = merge_configs(BASE, ours, BASE)
+    ok = check("只有一方修改时采用该方", not conflicts and merged['memos'] == 'a|b|c|d', (merged, conflicts))
+    _, conflicts = merge_configs(BASE, ours, version(memos='x|y|z|w'))
+    ok &= check("双方修改时整字段冲突", conflicts == [{'field': 'memos', 'key': None}], conflicts)
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("配置三方合并测试")
+    print("=" * 60)
+
+    results = [test_ordered_sets(), test_keyed_fields(), test_delete_vs_modify(), test_unmappable_fallback()]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 三方合并测试通过")
+        sys.exit(0)
+    print("❌ 三方合并测试失败")
+    sys.exit(1)
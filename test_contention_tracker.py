@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+锁竞争统计测试（contention_tracker.ContentionTracker，不需要数据库）
+    - acquire：排队深度、持锁结束后删除条目、timeout 内未拿到锁时 LockWaitTimeout
+    - retry_after：估计值限制在 [minimum, maximum / 2]，结果在 [估计值, 2 × 估计值] 内，锁超时压力放大并按半衰期衰减
+    - stats：等锁时间直方图与计数
+
+    python test_contention_tracker.py
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contention_tracker import ContentionTracker, LockWaitTimeout, WAIT_BUCKETS_MS
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"  {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_queue_depth() -> bool:
+    print("\n检查排队深度...")
+    tracker = ContentionTracker()
+    lock = threading.Lock()
+    release = threading.Event()
+    holding = threading.Event()
+
+    def holder():
+        with tracker.acquire('account', lock):
+            holding.set()
+            release.wait()
+
+    def waiter():
+        with tracker.acquire('account', lock):
+            pass
+
+    threads = [threading.Thread(target=holder)]
+    threads[0].start()
+    holding.wait()
+    ok = check("持锁者不计入排队深度", tracker.queue_depth('account') == 0)
+
+    threads += [threading.Thread(target=waiter) for _ in range(3)]
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.time() + 5
+    while tracker.queue_depth('account') < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    ok &= check("3 个请求在锁后排队", tracker.queue_depth('account') == 3)
+    ok &= check("其他键不受影响", tracker.queue_depth('other') == 0)
+    stats = tracker.stats()
+    ok &= check(f"stats 排队计数（{stats['waiting']} / {stats['max_depth']}）",
+                stats['waiting'] == 3 and stats['contended_keys'] == 1 and stats['max_depth'] == 3)
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    ok &= check("全部释放后删除条目", tracker.queue_depth('account') == 0 and not tracker._entries)
+    ok &= check("获得锁 4 次", tracker.stats()['acquired'] == 4)
+    return ok
+
+
+def test_lock_wait_timeout() -> bool:
+    print("\n检查限时等锁...")
+    tracker = ContentionTracker()
+    lock = threading.Lock()
+    lock.acquire()
+    start = time.monotonic()
+    try:
+        with tracker.acquire('account', lock, timeout=0.1):
+            timed_out = False
+    except LockWaitTimeout:
+        timed_out = True
+    waited = time.monotonic() - start
+    lock.release()
+
+    ok = check(f"timeout 内未拿到锁时 LockWaitTimeout（等待 {waited:.2f}s）", timed_out and 0.09 <= waited < 1)
+    stats = tracker.stats()
+    ok &= check("计入 lock_wait_timeouts 与压力", stats['lock_wait_timeouts'] == 1 and stats['pressure'] > 0.9)
+    ok &= check("超时后删除条目，锁未被占用", not tracker._entries and not lock.locked())
+    return ok
+
+
+def test_retry_after() -> bool:
+    print("\n检查 retry_after...")
+    tracker = ContentionTracker(pressure_half_life=0.2)
+    rng = random.Random(7)
+
+    values = [tracker.retry_after('account', 1.0, 30.0, rng) for _ in range(200)]
+    ok = check(f"无排队时在 [minimum, 2 × minimum] 内（{min(values)} ~ {max(values)}）",
+               all(1.0 <= value <= 2.0 for value in values) and len(set(values)) > 1)
+
+    # 模拟持锁时间 2s、排队 20 个：估计值 40s 超过 maximum / 2，按 15s 计
+    entry_lock = threading.Lock()
+    with tracker.acquire('account', entry_lock):
+        tracker._entries['account'].hold_ewma = 2.0
+        tracker._entries['account'].waiting = 20
+        values = [tracker.retry_after('account', 1.0, 30.0, rng) for _ in range(200)]
+        tracker._entries['account'].waiting = 0
+    ok &= check(f"估计值不超过 maximum / 2（{min(values)} ~ {max(values)}）",
+                all(15.0 <= value <= 30.0 for value in values))
+
+    # 排队 2 个、持锁 0.5s：估计值 1s，近期一次锁超时后约放大为 2 倍
+    with tracker.acquire('pressured', entry_lock):
+        tracker._entries['pressured'].hold_ewma = 0.5
+        tracker._entries['pressured'].waiting = 2
+        base = tracker.retry_after('pressured', 0.1, 30.0, random.Random(1))
+        tracker.record_lock_timeout('pressured')
+        pressured = tracker.retry_after('pressured', 0.1, 30.0, random.Random(1))
+        tracker._entries['pressured'].waiting = 0
+    ok &= check(f"锁超时压力放大 retry_after（{base} → {pressured}）", pressured >= 1.8 * base)
+    time.sleep(1.0)
+    ok &= check(f"压力按半衰期衰减（{tracker.stats()['pressure']}）", tracker.stats()['pressure'] < 0.05)
+    return ok
+
+
+def test_histogram() -> bool:
+    print("\n检查等锁时间直方图...")
+    tracker = ContentionTracker()
+    lock = threading.Lock()
+    for _ in range(5):
+        with tracker.acquire('account', lock):
+            pass
+
+    lock.acquire()
+    timer = threading.Timer(0.06, lock.release)
+    timer.start()
+    with tracker.acquire('account', lock):
+        pass
+    timer.join()
+
+    histogram = tracker.stats()['wait_histogram_ms']
+    ok = check("桶上界与计数一一对应", histogram['le_ms'] == list(WAIT_BUCKETS_MS) + [None]
+               and len(histogram['counts']) == len(WAIT_BUCKETS_MS) + 1)
+    ok &= check(f"无竞争的 5 次落在第一个桶（{histogram['counts']}）", histogram['counts'][0] == 5)
+    ok &= check("等待约 60ms 的一次落在 100ms 桶",
+                histogram['counts'][WAIT_BUCKETS_MS.index(100)] == 1 and sum(histogram['counts']) == 6)
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("锁竞争统计测试")
+    print("=" * 60)
+
+    results = [test_queue_depth(), test_lock_wait_timeout(), test_retry_after(), test_histogram()]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 锁竞争统计测试通过")
+        sys.exit(0)
+    print("❌ 锁竞争统计测试失败")
+    sys.exit(1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+平滑重启测试 - 持续保存配置的同时多次向 gunicorn master 发送 HUP，统计错误
+
+用 gunicorn_conf.py 中的 hook（排空 / 退出前等待）启动一个临时 gunicorn（SQLite 临时库），
+多个客户端循环保存配置:
+    - 503 + retry_after（排空中 / 服务繁忙）按 retry_after 等待后重试，计为正常
+    - 409（revision 冲突）取服务端 revision 后重试，计为正常
+    - 连接错误、其他 5xx 计为错误
+测试结束后检查每个账户服务端 revision 等于客户端成功保存的次数（没有丢失或重复写入）。
+
+    python test_graceful_reload.py --reloads 5 --clients 8
+    python test_graceful_reload.py --no-drain      # 对照：gunicorn 默认的 SIGTERM 处理
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import requests
+
+PORT = 5078
+
+
+def write_gunicorn_config(path: str, port: int, workers: int, threads: int, drain: bool):
+    """复用 gunicorn_conf.py 中的 hook，只替换部署相关的设置（drain=False 时不注册排空 hook，作为对照）"""
+    hooks = 'when_ready, post_fork, graceful_timeout' + (', post_worker_init, worker_exit' if drain else '')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(
+            "import sys\n"
+            f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+            f"from gunicorn_conf import {hooks}\n"
+            f"bind = '127.0.0.1:{port}'\n"
+            f"workers = {workers}\n"
+            f"threads = {threads}\n"
+            "preload_app = True\n"
+        )
+
+
+def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('gunicorn 未能启动')
+
+
+def login(base_url: str, username: str) -> str:
+    requests.post(f"{base_url}/auth/register", json={'username': username, 'password': 'reload'})
+    resp = requests.post(f"{base_url}/auth/login", json={'username': username, 'password': 'reload'})
+    resp.raise_for_status()
+    return resp.json()['token']['token']
+
+
+class SaveClient(threading.Thread):
+    """循环保存配置，记录每次请求的结果"""
+
+    def __init__(self, base_url: str, token: str, stop: threading.Event, results: Counter, lock: threading.Lock):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.stop = stop
+        self.results = results
+        self.lock = lock
+        self.revision = 0
+        self.saved = 0
+        self.max_latency = 0.0
+
+    def record(self, outcome: str, latency: float):
+        with self.lock:
+            self.results[outcome] += 1
+        self.max_latency = max(self.max_latency, latency)
+
+    def run(self):
+        session = requests.Session()
+        while not self.stop.is_set():
+            payload = {
+                'revision': self.revision,
+                'stock_codes': 'sh600519|sz000001',
+                'holdings': f"{(self.saved + 1) * 100}*1650.000|",
+                'last_client': 'reload-test',
+            }
+            start = time.perf_counter()
+            try:
+                resp = session.post(f"{self.base_url}/sync/config", json=payload, headers=self.headers, timeout=30)
+            except requests.ConnectionError:
+                self.record('connection_error', time.perf_counter() - start)
+                session = requests.Session()
+                time.sleep(0.1)
+                continue
+            latency = time.perf_counter() - start
+
+            if resp.status_code == 200:
+                self.revision = resp.json()['config']['revision']
+                self.saved += 1
+                self.record('200', latency)
+            elif resp.status_code == 409:
+                self.revision = resp.json().get('server_revision', self.revision)
+                self.record('409', latency)
+            elif resp.status_code == 503 and 'retry_after' in resp.json():
+                self.record('503_retry', latency)
+                time.sleep(resp.json()['retry_after'])
+            else:
+                self.record(str(resp.status_code), latency)
+                time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='平滑重启（HUP）测试')
+    parser.add_argument('--reloads', type=int, default=5)
+    parser.add_argument('--interval', type=float, default=2.0, help='两次 HUP 之间的秒数')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--no-drain', action='store_true', help='不注册排空 hook（gunicorn 默认的 SIGTERM 处理，对照用）')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='graceful_reload_')
+    config_path = os.path.join(workdir, 'gunicorn_test_conf.py')
+    write_gunicorn_config(config_path, args.port, args.workers, args.threads, drain=not args.no_drain)
+    env = dict(
+        os.environ,
+        FLASK_SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'reload.db')}",
+        FLASK_RATE_LIMIT_ENABLED='false',
+        FLASK_RATE_LIMIT_SHM_PATH=os.path.join(workdir, 'rate_limit'),
+    )
+    subprocess.run(
+        [sys.executable, '-c', 'from app import app, db\nwith app.app_context(): db.create_all()'],
+        env=env, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', config_path, 'app:app'],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, 'gunicorn.log'), 'w'),
+    )
+    try:
+        wait_ready(base_url)
+        tokens = [login(base_url, f"reload_user_{i}") for i in range(args.clients)]
+
+        stop = threading.Event()
+        results = Counter()
+        lock = threading.Lock()
+        clients = [SaveClient(base_url, token, stop, results, lock) for token in tokens]
+        for client in clients:
+            client.start()
+
+        for i in range(args.reloads):
+            time.sleep(args.interval)
+            print(f"[{i + 1}/{args.reloads}] HUP → master {server.pid}")
+            server.send_signal(signal.SIGHUP)
+        time.sleep(args.interval)
+        stop.set()
+        for client in clients:
+            client.join()
+
+        # 服务端 revision 应等于客户端成功保存的次数
+        mismatched = []
+        for client, token in zip(clients, tokens):
+            version = requests.get(f"{base_url}/sync/version", headers={'Authorization': f'Bearer {token}'}).json()
+            if version['revision'] != client.saved:
+                mismatched.append((client.saved, version['revision']))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    errors = sum(count for outcome, count in results.items() if outcome not in ('200', '409', '503_retry'))
+    print("=" * 60)
+    print(f"平滑重启测试{'（无排空 hook）' if args.no_drain else ''}: {args.reloads} 次 HUP, {args.clients} 个客户端, "
+          f"{args.workers} workers × {args.threads} threads")
+    print("=" * 60)
+    for outcome, count in sorted(results.items()):
+        print(f"  {outcome:<18} {count}")
+    print(f"  最大延迟          {max(client.max_latency for client in clients) * 1000:.0f} ms")
+    print(f"  revision 不一致    {len(mismatched)} {mismatched[:5] if mismatched else ''}")
+    print(f"  gunicorn 日志      {os.path.join(workdir, 'gunicorn.log')}")
+
+    if errors or mismatched:
+        print("❌ 平滑重启期间出现错误")
+        sys.exit(1)
+    print("✅ 平滑重启期间没有失败的请求")
+
+
+if __name__ == '__main__':
+    main()
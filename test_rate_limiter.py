@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+限流测试
+    - TokenBucketTable：桶容量（burst）、按 rate 补充、多桶同时扣减（任一不足时都不扣，新桶不互相覆盖槽位）、跨进程共享
+    - rate_limited：已登录接口按登录会话计 device 桶（同一 IP 的不同会话互不影响），
+      账户桶不被 device 桶拒绝的请求消耗，/sync/batch 的每个 save 计入保存限额，
+      匿名接口按 RATE_LIMIT_CLIENT_IP_HEADER 取客户端 IP
+
+    python test_rate_limiter.py
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limiter import TokenBucketTable
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"  {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_refill_and_burst(workdir: str) -> bool:
+    """满桶可连续取 burst 个，之后按 rate 补充"""
+    print("\n检查令牌桶容量与补充...")
+    table = TokenBucketTable(os.path.join(workdir, 'burst'), slots=64)
+    rate, burst = 20.0, 5
+
+    results = [table.consume('k', rate, burst) for _ in range(burst)]
+    ok = check(f"满桶连续取 {burst} 个成功", all(r == 0 for r in results))
+    retry_after = table.consume('k', rate, burst)
+    ok &= check(f"第 {burst + 1} 个被拒绝，retry_after={retry_after:.3f}s", 0 < retry_after <= 1 / rate + 0.01)
+
+    time.sleep(retry_after + 0.02)
+    ok &= check("等待 retry_after 后补充出一个令牌", table.consume('k', rate, burst) == 0)
+    ok &= check("补充的令牌用完后再次被拒绝", table.consume('k', rate, burst) > 0)
+
+    time.sleep(1.0)
+    refilled = sum(table.consume('k', rate, burst) == 0 for _ in range(burst * 3))
+    ok &= check(f"空闲 1s 后最多补满 {burst} 个（实际 {refilled}）", refilled == burst)
+    ok &= check("不同 key 互不影响", table.consume('other', rate, burst) == 0)
+    return ok
+
+
+def test_consume_all(workdir: str) -> bool:
+    """多桶同时扣减：任一不足时都不扣减"""
+    print("\n检查多桶同时扣减...")
+    table = TokenBucketTable(os.path.join(workdir, 'all'), slots=64)
+    account = ('account', 0.001, 3)
+    device = ('device', 0.001, 1)
+
+    ok = check("两个桶都有令牌时成功", table.consume_all([account, device]) == 0)
+    ok &= check("device 桶为空时拒绝", table.consume_all([account, device]) > 0)
+    ok &= check("被拒绝的请求没有消耗 account 桶（还剩 2 个）",
+                table.consume_all([account]) == 0 and table.consume_all([account]) == 0
+                and table.consume_all([account]) > 0)
+
+    # 槽位很少时两个新桶的探测范围重叠，应各自占用不同槽位（后写入的不覆盖先写入的）
+    small = TokenBucketTable(os.path.join(workdir, 'small'), slots=2)
+    first, second = ('first', 0.001, 1), ('second', 0.001, 1)
+    ok &= check("同时新建的两个桶都扣减成功", small.consume_all([first, second]) == 0)
+    ok &= check("两个新桶都已保存（各自再取都被拒绝）",
+                small.consume_all([first]) > 0 and small.consume_all([second]) > 0)
+    return ok
+
+
+def _consume_in_child(path: str, count: int, queue):
+    table = TokenBucketTable(path, slots=64)
+    queue.put(sum(table.consume('shared', 0.001, 10) == 0 for _ in range(count)))
+
+
+def test_shared_between_processes(workdir: str) -> bool:
+    """同一共享内存文件的多个进程共用桶"""
+    print("\n检查跨进程共享...")
+    path = os.path.join(workdir, 'shared')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    children = [context.Process(target=_consume_in_child, args=(path, 10, queue)) for _ in range(4)]
+    for child in children:
+        child.start()
+    granted = sum(queue.get(timeout=30) for _ in children)
+    for child in children:
+        child.join()
+    return check(f"4 个进程各取 10 次，共成功 {granted} 次（桶容量 10）", granted == 10)
+
+
+def test_rate_limited_routes(workdir: str) -> bool:
+    """rate_limited 的桶划分"""
+    print("\n检查接口限流的桶划分...")
+    import app as app_module
+
+    app = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'RATE_LIMIT_SHM_PATH': os.path.join(workdir, 'app_rate_limit'),
+        'RATE_LIMIT_CLIENT_IP_HEADER': 'X-Forwarded-For',
+        'RATE_LIMITS': {
+            'sync_config_save': {'account': (0.001, 3), 'device': (0.001, 2)},
+            'auth_available': {'device': (0.001, 2)},
+        },
+    })
+    with app.app_context():
+        app_module.db.create_all()
+    client = app.test_client()
+
+    client.post('/auth/register', json={'username': 'rate_test', 'password': 'rate'})
+    sessions = []
+    for _ in range(2):
+        resp = client.post('/auth/login', json={'username': 'rate_test', 'password': 'rate'})
+        sessions.append({'Authorization': f"Bearer {resp.get_json()['token']['token']}"})
+
+    def save(headers):
+        return client.post('/sync/config', headers=headers, json={'stock_codes': 'sh600000', 'revision': 0}).status_code
+
+    first = [save(sessions[0]) for _ in range(3)]
+    ok = check(f"会话 1: device 桶容量 2，第 3 次 429（{first}）", 429 not in first[:2] and first[2] == 429)
+    ok &= check("会话 2（同一 IP）有独立的 device 桶，账户桶还剩 1 个", save(sessions[1]) != 429)
+    ok &= check("账户桶用完后会话 2 也被拒绝", save(sessions[1]) == 429)
+
+    client.post('/auth/register', json={'username': 'batch_test', 'password': 'rate'})
+    resp = client.post('/auth/login', json={'username': 'batch_test', 'password': 'rate'})
+    batch_session = {'Authorization': f"Bearer {resp.get_json()['token']['token']}"}
+
+    def batch(*ops):
+        return client.post('/sync/batch', headers=batch_session, json={'ops': list(ops)}).status_code
+
+    save_op = {'op': 'save', 'stock_codes': 'sh600000'}
+    ok &= check("/sync/batch：2 个 save 用完 device 桶（容量 2）", batch(save_op, dict(save_op, revision=1)) == 200)
+    ok &= check("/sync/batch：只读操作不消耗保存限额", batch({'op': 'version'}, {'op': 'get'}) == 200)
+    ok &= check("/sync/batch：保存限额用完后含 save 的批量请求 429", batch({'op': 'version'}, save_op) == 429)
+
+    def available(forwarded_for):
+        return client.get('/auth/available?username=nobody',
+                          headers={'X-Forwarded-For': forwarded_for}).status_code
+
+    ok &= check("匿名接口：同一客户端 IP 第 3 次 429",
+                [available('10.0.0.1, 192.168.1.10') for _ in range(3)] == [200, 200, 429])
+    ok &= check("匿名接口：代理追加的客户端 IP 不同则桶不同", available('10.0.0.1, 192.168.1.11') == 200)
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("限流测试")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp(prefix='test_rate_limiter_')
+    results = [
+        test_refill_and_burst(workdir),
+        test_consume_all(workdir),
+        test_shared_between_processes(workdir),
+        test_rate_limited_routes(workdir),
+    ]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 限流测试通过")
+        sys.exit(0)
+    print("❌ 限流测试失败")
+    sys.exit(1)
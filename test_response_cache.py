@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+GET /sync/config 已编码响应缓存测试
+验证缓存命中时返回的 Content-Type / Content-Encoding 与首次（未命中）响应一致:
+    - 安装了 msgpack：Accept: application/msgpack 两次都返回 MessagePack
+    - 未安装 msgpack（模拟为 app.msgpack = None）：两次都返回 JSON，且标注为 application/json
+    - gzip / 不压缩各自缓存，命中时响应体与首次相同
+
+    python test_response_cache.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from bench_wire_format import build_portfolio
+
+
+def create_client(workdir: str, name: str):
+    """SQLite 临时库 + 已保存配置的账号，返回 (client, headers)"""
+    app = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, name + '.db')}",
+        'RATE_LIMIT_ENABLED': False,
+        'RATE_LIMIT_SHM_PATH': os.path.join(workdir, name + '_rate_limit'),
+    })
+    with app.app_context():
+        app_module.db.create_all()
+
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'cache_test', 'password': 'cache'})
+    resp = client.post('/auth/login', json={'username': 'cache_test', 'password': 'cache'})
+    headers = {'Authorization': f"Bearer {resp.get_json()['token']['token']}"}
+    resp = client.post('/sync/config', headers=headers, json=dict(build_portfolio(200), revision=0))
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return client, headers
+
+
+def fetch_twice(client, headers: dict) -> list:
+    """同一请求连续两次（第一次未命中写入缓存，第二次命中）"""
+    return [client.get('/sync/config', headers=headers) for _ in range(2)]
+
+
+def check_pair(label: str, responses: list, mimetype: str, content_encoding) -> bool:
+    ok = True
+    for index, resp in enumerate(responses):
+        actual = (resp.status_code, resp.mimetype, resp.headers.get('Content-Encoding'))
+        expected = (200, mimetype, content_encoding)
+        if actual != expected:
+            print(f"  ❌ {label} 第 {index + 1} 次: {actual}，期望 {expected}")
+            ok = False
+    if responses[0].get_data() != responses[1].get_data():
+        print(f"  ❌ {label}: 缓存命中的响应体与首次不同")
+        ok = False
+    if ok:
+        print(f"  ✅ {label}: {mimetype} / {content_encoding or 'identity'}")
+    return ok
+
+
+def test_msgpack_negotiation(workdir: str) -> bool:
+    """Accept: application/msgpack（安装 / 未安装 msgpack）"""
+    print("\n检查 MessagePack 协商...")
+    ok = True
+    accept = {'Accept': 'application/msgpack', 'Accept-Encoding': 'identity'}
+
+    if app_module.msgpack is not None:
+        client, headers = create_client(workdir, 'msgpack')
+        responses = fetch_twice(client, dict(headers, **accept))
+        ok &= check_pair('msgpack 已安装', responses, 'application/msgpack', None)
+    else:
+        print("  ℹ️  未安装 msgpack，跳过 MessagePack 响应检查")
+
+    installed = app_module.msgpack
+    app_module.msgpack = None
+    try:
+        client, headers = create_client(workdir, 'no_msgpack')
+        responses = fetch_twice(client, dict(headers, **accept))
+        ok &= check_pair('msgpack 未安装', responses, 'application/json', None)
+        try:
+            json.loads(responses[1].get_data())
+        except ValueError:
+            print("  ❌ msgpack 未安装: 缓存命中的响应体不是 JSON")
+            ok = False
+    finally:
+        app_module.msgpack = installed
+    return ok
+
+
+def test_compression_variants(workdir: str) -> bool:
+    """不同 Accept-Encoding 分别缓存"""
+    print("\n检查压缩方式...")
+    client, headers = create_client(workdir, 'encoding')
+    ok = check_pair('gzip', fetch_twice(client, dict(headers, **{'Accept-Encoding': 'gzip'})),
+                    'application/json', 'gzip')
+    ok &= check_pair('identity', fetch_twice(client, dict(headers, **{'Accept-Encoding': 'identity'})),
+                     'application/json', None)
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("GET /sync/config 响应缓存测试")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp(prefix='test_response_cache_')
+    results = [test_msgpack_negotiation(workdir), test_compression_variants(workdir)]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 响应缓存测试通过")
+        sys.exit(0)
+    print("❌ 响应缓存测试失败")
+    sys.exit(1)
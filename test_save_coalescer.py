@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+配置保存合并测试
+    - SaveCoalescer：同一键排队的请求只有最后一个不被 superseded，批次内 applied_revision 共享，批次结束后清空
+    - /sync/config：持有账户锁期间同一设备排队的两次保存只执行最后一次；另一设备基于同一 revision 的保存
+      与之竞争时，先执行的成功，后执行的按冲突返回 409（合并队列的快进不会越过其他设备的写入）
+
+    python test_save_coalescer.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from save_coalescer import SaveCoalescer
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"  {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_slots() -> bool:
+    print("\n检查合并队列...")
+    coalescer = SaveCoalescer()
+    key = (1, 'token', 5)
+
+    with coalescer.slot(key) as first, coalescer.slot(key) as second:
+        ok = check("先进入的请求被后进入的 superseded", first.superseded and not second.superseded)
+        with coalescer.slot((1, 'token', 6)) as other:
+            ok &= check("不同 base revision 不合并", not other.superseded and not second.superseded)
+        first.record_applied(6)
+        ok &= check("同一批次共享前一个请求写入后的 revision", second.applied_revision == 6)
+
+    ok &= check("批次结束后清空", len(coalescer) == 0)
+    with coalescer.slot(key) as later:
+        ok &= check("之后的新批次不继承 applied_revision", later.applied_revision is None and not later.superseded)
+
+    with coalescer.slot(None) as first, coalescer.slot(None) as second:
+        ok &= check("key 为 None 时不参与合并", not first.superseded and not second.superseded
+                    and first.applied_revision is None)
+    return ok
+
+
+def test_threads() -> bool:
+    print("\n检查并发进入...")
+    coalescer = SaveCoalescer()
+    lock = threading.Lock()
+    executed = []
+    superseded = []
+    queued = threading.Barrier(9)
+
+    def save(index):
+        with coalescer.slot(('account', 'device', 1)) as slot:
+            queued.wait()
+            with lock:
+                (superseded if slot.superseded else executed).append(index)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    with lock:
+        for thread in threads:
+            thread.start()
+        queued.wait()
+    for thread in threads:
+        thread.join()
+    ok = check(f"8 个排队请求只执行 1 个（执行 {executed}）", len(executed) == 1 and len(superseded) == 7)
+    ok &= check("执行完后清空", len(coalescer) == 0)
+    return ok
+
+
+def test_revision_race(workdir: str) -> bool:
+    print("\n检查与其他设备的 revision 竞争...")
+    import app as app_module
+
+    app = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'RATE_LIMIT_ENABLED': False,
+        'RATE_LIMIT_SHM_PATH': os.path.join(workdir, 'rate_limit'),
+    })
+    with app.app_context():
+        app_module.db.create_all()
+    client = app.test_client()
+    client.post('/auth/register', json={'username': 'coalesce', 'password': 'x'})
+    tokens = []
+    for _ in range(2):
+        resp = client.post('/auth/login', json={'username': 'coalesce', 'password': 'x'})
+        tokens.append({'Authorization': f"Bearer {resp.get_json()['token']['token']}"})
+    device_a, device_b = tokens
+    resp = client.post('/sync/config', headers=device_a,
+                       json={'stock_codes': 'sh600000,sz000001', 'holdings': '100*10,', 'revision': 0})
+    account_id = resp.get_json()['config']['account_id']
+
+    results = {}
+
+    def save(name, headers, holdings):
+        resp = app.test_client().post('/sync/config', headers=headers, json={
+            'stock_codes': 'sh600000,sz000001', 'holdings': holdings, 'revision': 1,
+        })
+        results[name] = (resp.status_code, resp.get_json())
+
+    state = app.extensions['ahfunstock']
+    with app.app_context():
+        account_lock = app_module.get_account_lock(account_id)
+    threads = []
+    with account_lock:
+        # 按顺序排队：A1、A2（同一设备）与 B（另一设备）都基于 revision 1，修改同一持仓
+        for name, headers, holdings in (('A1', device_a, '200*10,'), ('A2', device_a, '300*10,'),
+                                        ('B', device_b, '400*10,')):
+            thread = threading.Thread(target=save, args=(name, headers, holdings))
+            thread.start()
+            threads.append(thread)
+            deadline = time.time() + 5
+            while state.save_contention.queue_depth(account_id) < len(threads) and time.time() < deadline:
+                time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    statuses = {name: status for name, (status, _) in results.items()}
+    ok = check(f"A1 被同设备的 A2 合并（{statuses}）", statuses.get('A1') == 202)
+    ok &= check("A2 与 B 一个成功、一个冲突", sorted((statuses.get('A2'), statuses.get('B'))) == [200, 409])
+
+    winner = 'A2' if statuses.get('A2') == 200 else 'B'
+    with app.app_context():
+        config = app_module.PortfolioConfig.query.filter_by(account_id=account_id).one()
+        expected = {'A2': '300*10,', 'B': '400*10,'}[winner]
+        ok &= check(f"服务端为成功一方（{winner}）的内容，revision 2", config.holdings == expected and config.revision == 2)
+    return ok
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("配置保存合并测试")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp(prefix='test_save_coalescer_')
+    results = [test_slots(), test_threads(), test_revision_race(workdir)]
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ 保存合并测试通过")
+        sys.exit(0)
+    print("❌ 保存合并测试失败")
+    sys.exit(1)
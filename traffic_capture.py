@@ -0,0 +1,98 @@
+"""
+流量录制
+
+请求结束时把脱敏后的元数据（路由、大小、耗时、状态码、账号 hash）放入队列，
+由后台线程异步写入按大小滚动的 JSONL 文件，请求线程不做文件 IO。
+每个进程写自己的文件（traffic-<pid>.jsonl），避免多个 gunicorn worker 同时滚动同一文件。
+录制文件可用 `python bench_load.py --scenario replay --replay captures/*.jsonl` 回放。
+"""
+
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficRecorder:
+    """采样 + 异步写入的流量录制器"""
+
+    def __init__(self, directory: str, sample_rate: float, salt: bytes,
+                 max_bytes: int = 50 * 1024 * 1024, backup_count: int = 10, queue_size: int = 10000):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped = 0
+        self._salt = salt
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._handler = None
+
+    def account_hash(self, identity: str) -> str:
+        """账号 / 设备标识的 HMAC（不可逆，同一标识在各进程一致）"""
+        return hmac.new(self._salt, identity.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+    def sampled(self, account: Optional[str]) -> bool:
+        """按账号采样（同一账号的请求要么全录要么全不录，回放时保持账号内顺序）"""
+        if self.sample_rate >= 1:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        if account:
+            return int(account[:8], 16) / 0xFFFFFFFF < self.sample_rate
+        return random.random() < self.sample_rate
+
+    def record(self, entry: dict):
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # 写入跟不上时丢弃，不阻塞请求
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # fork 之后在子进程中重新创建写入线程与文件
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'traffic-{os.getpid()}.jsonl')
+            self._handler = RotatingFileHandler(path, maxBytes=self.max_bytes,
+                                                backupCount=self.backup_count, encoding='utf-8')
+            self._handler.setFormatter(logging.Formatter('%(message)s'))
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            threading.Thread(target=self._run, name='traffic-capture', daemon=True).start()
+            atexit.register(self.flush)
+            self._pid = os.getpid()
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        self._handler.emit(logging.makeLogRecord({'msg': line}))
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(entry)
+            except Exception as e:
+                logger.error(f"Failed to write traffic capture: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """等待队列写完（进程退出时调用）"""
+        if self._pid == os.getpid():
+            self._queue.join()
+            self._handler.flush()